@@ -1,9 +1,143 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from models.user import User, db
+from models.follow import Follow, FollowCount
+from utils.db_utils import upsert_increment
+from utils.feed_ranking import load_candidates, viewer_signals, ranking_context, rank
+from utils.fieldsets import parse_fields, InvalidFieldsError
+from utils.post_cache import get_posts_by_ids
+from utils.post_projection import ALL_POST_FIELDS
+from utils.timeline import read_timeline, invalidate_timeline
 
 feed_bp = Blueprint('feed', __name__)
- 
+
 @feed_bp.route('/', methods=['GET', 'OPTIONS'])
+@jwt_required()
 def get_feed():
+    """Home timeline: posts by the current user and everyone they follow, newest first
+
+    ?cursor=<id of the last post seen> continues after that post.
+    ?order=ranked orders the timeline by feed_ranking score instead, paged with ?page=.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        user_id = int(get_jwt_identity())
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+        cursor = request.args.get('cursor', type=int)
+        try:
+            fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+        except InvalidFieldsError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if request.args.get('order') == 'ranked':
+            return get_ranked_feed(user_id, limit, fields)
+
+        # Read the timeline one page (plus one id, to detect a next page) at a time; deleted or
+        # unpublished posts drop out while hydrating, so keep reading until the page is full
+        posts = []
+        has_next = False
+        before = cursor
+        while not has_next:
+            chunk = read_timeline(user_id, before, limit + 1)
+            found = get_posts_by_ids(chunk, fields)
+            for pid in chunk:
+                if len(posts) == limit:
+                    has_next = True
+                    break
+                if pid in found:
+                    posts.append(found[pid])
+            if len(chunk) <= limit:
+                break
+            before = chunk[-1]
+
+        return jsonify({
+            'posts': posts,
+            'pagination': {
+                'limit': limit,
+                'cursor': cursor,
+                'next_cursor': posts[-1]['id'] if has_next and posts else None,
+                'has_next': has_next
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch feed: {str(e)}'}), 500
+
+def get_ranked_feed(user_id, limit, fields):
+    """Score the whole timeline in one batch and return one page of it"""
+    page = max(request.args.get('page', 1, type=int), 1)
+
+    candidates = load_candidates(read_timeline(user_id))
+    author_affinity, tag_interest = viewer_signals(user_id)
+    ranked = rank(candidates, context=ranking_context(author_affinity=author_affinity, tag_interest=tag_interest))
+
+    page_ids = ranked[(page - 1) * limit:page * limit]
+    found = get_posts_by_ids(page_ids, fields)
+    posts = [found[pid] for pid in page_ids if pid in found]
+
+    return jsonify({
+        'posts': posts,
+        'pagination': {
+            'page': page,
+            'limit': limit,
+            'total': len(ranked),
+            'has_next': page * limit < len(ranked)
+        }
+    }), 200
+
+@feed_bp.route('/follow/<int:user_id>', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def follow_user(user_id):
+    """Follow a user (idempotent)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        follower_id = int(get_jwt_identity())
+        if follower_id == user_id:
+            return jsonify({'error': 'You cannot follow yourself'}), 400
+        if not User.query.get(user_id):
+            return jsonify({'error': 'User not found'}), 404
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(Follow(follower_id=follower_id, followee_id=user_id))
+                db.session.flush()
+                upsert_increment(FollowCount, [{'user_id': user_id, 'followers': 1}], ['user_id'], ['followers'])
+            db.session.commit()
+        except IntegrityError:
+            # Already following
+            db.session.rollback()
+
+        # The followee's existing posts are merged in when the timeline is rebuilt
+        invalidate_timeline(follower_id)
+        return jsonify({'message': 'User followed successfully', 'following': True}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to follow user: {str(e)}'}), 500
+
+@feed_bp.route('/follow/<int:user_id>', methods=['DELETE', 'OPTIONS'])
+@jwt_required()
+def unfollow_user(user_id):
+    """Stop following a user (idempotent)"""
     if request.method == 'OPTIONS':
         return '', 200
-    return jsonify({'message': 'Feed endpoint - to be implemented'}), 200 
\ No newline at end of file
+
+    try:
+        follower_id = int(get_jwt_identity())
+        deleted = Follow.query.filter_by(follower_id=follower_id, followee_id=user_id).delete()
+        if deleted:
+            upsert_increment(FollowCount, [{'user_id': user_id, 'followers': -deleted}], ['user_id'], ['followers'])
+        db.session.commit()
+
+        if deleted:
+            invalidate_timeline(follower_id)
+        return jsonify({'message': 'User unfollowed successfully', 'following': False}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to unfollow user: {str(e)}'}), 500
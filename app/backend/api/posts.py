@@ -1,68 +1,37 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User, db
 from models.post import Post
 from utils.media_processor import MediaProcessor
-from sqlalchemy import or_, and_, desc, asc, func, String
-from sqlalchemy.orm import joinedload
+from utils.post_projection import listing_query, compile_row_serializer, ALL_POST_FIELDS
+from utils.fieldsets import parse_fields, InvalidFieldsError
+from utils.post_cache import post_cache_scopes, post_counter_scopes, missing_post_cache_key, get_posts_by_ids
+from utils.post_import import import_posts, PostImportError
+from utils.timeline import fan_out
+from utils.post_export import iter_posts, iter_ndjson, EXPORT_CHUNK_SIZE, MAX_EXPORT_CHUNK_SIZE
+from utils.pagination import encode_cursor, decode_cursor, apply_keyset, InvalidCursorError
+from utils.search_index import index_post, remove_post, search_scores
+from utils.post_tags import (
+    sync_post_tags, remove_post_tags, posts_with_all_tags,
+    counted_tags, update_tag_counts, top_tags, normalize_tags
+)
+from utils.post_stats import stats_snapshot, update_post_stats, bump_post_stats, read_post_stats
+from utils.view_counter import record_view
+from utils.likes import like, unlike, like_counts, liked_post_ids, remove_post_likes
+from utils.unique_viewers import record_viewer, daily_unique_viewers, remove_post_view_sketches
+from utils.trending import record_trending_event, remove_trending, iter_trending
+from sqlalchemy import desc, asc, func, false
 import json
 import os
 from datetime import datetime, timedelta
 from config import Config
-import redis
-import pickle
+from utils.cache import bump_generations, get_scoped_cache_key, get_cached_data, set_cached_data, delete_cached_data
+from utils.response_cache import get_or_compute_response, version_etag
 
 posts_bp = Blueprint('posts', __name__)
  
-# Initialize Redis for caching (optional - will work without Redis)
-try:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=False)
-    REDIS_AVAILABLE = True
-except:
-    REDIS_AVAILABLE = False
-    redis_client = None
-
-def get_cache_key(prefix, **kwargs):
-    """Generate cache key for Redis"""
-    key_parts = [prefix]
-    for k, v in sorted(kwargs.items()):
-        key_parts.append(f"{k}:{v}")
-    return ":".join(key_parts)
-
-def get_cached_data(key, expire_time=300):
-    """Get data from cache"""
-    if not REDIS_AVAILABLE:
-        return None
-    
-    try:
-        data = redis_client.get(key)
-        if data:
-            return pickle.loads(data)
-    except:
-        pass
-    return None
-
-def set_cached_data(key, data, expire_time=300):
-    """Set data in cache"""
-    if not REDIS_AVAILABLE:
-        return
-    
-    try:
-        redis_client.setex(key, expire_time, pickle.dumps(data))
-    except:
-        pass
-
-def invalidate_cache_pattern(pattern):
-    """Invalidate cache by pattern"""
-    if not REDIS_AVAILABLE:
-        return
-    
-    try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            redis_client.delete(*keys)
-    except:
-        pass
+class PostUnavailable(Exception):
+    """Raised while building a post response for a missing or unpublished post"""
 
 @posts_bp.route('/', methods=['GET', 'OPTIONS'])
 @jwt_required()
@@ -73,28 +42,68 @@ def get_posts():
     
     try:
         # Get query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 50)  # Max 50 per page
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)  # 1 to 50 per page
         user_id = request.args.get('user_id', type=int)
         search = request.args.get('search', '').strip()
         category = request.args.get('category', '').strip()
         tags = request.args.get('tags', '').strip()
         visibility = request.args.get('visibility', '').strip()
-        sort_by = request.args.get('sort_by', 'created_at')
+        # Search results are ranked by relevance unless another sort is requested;
+        # sort_by=trending reads the decayed-engagement index (highest first, page mode only)
+        sort_by = request.args.get('sort_by', 'relevance' if search else 'created_at')
         sort_order = request.args.get('sort_order', 'desc')
         
+        # Cursor mode: present `cursor` (empty for the first page) switches to keyset pagination
+        cursor_mode = 'cursor' in request.args
+        cursor = request.args.get('cursor', '').strip()
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+        
         # Validate sort parameters
-        allowed_sort_fields = ['created_at', 'updated_at', 'likes_count', 'views_count', 'comments_count', 'shares_count']
+        allowed_sort_fields = Post.SORTABLE_FIELDS + ['trending'] + (['relevance'] if search else [])
         if sort_by not in allowed_sort_fields:
             sort_by = 'created_at'
         
+        if sort_by == 'trending' and cursor_mode:
+            return jsonify({'error': 'Cursor pagination is not supported for sort_by=trending'}), 400
+        
         if sort_order not in ['asc', 'desc']:
             sort_order = 'desc'
         
+        position = None
+        if cursor_mode and cursor:
+            try:
+                position = decode_cursor(cursor, sort_by, sort_order)
+            except InvalidCursorError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Sparse fieldset: only the requested columns are selected and serialized
+        try:
+            fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+        except InvalidFieldsError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Tags double as categories; every requested tag must match exactly
+        required_tags = [category] if category else []
+        if tags:
+            required_tags.extend(tag.strip() for tag in tags.split(',') if tag.strip())
+        
+        # The narrowest scope that every matching post belongs to decides when this page goes stale
+        if user_id:
+            scopes = [f'author:{user_id}']
+        elif required_tags:
+            scopes = [f'tag:{tag}' for tag in normalize_tags(required_tags)]
+        elif visibility == 'featured':
+            scopes = ['featured']
+        else:
+            scopes = ['posts']
+        
         # Build cache key
-        cache_key = get_cache_key(
+        cache_key = get_scoped_cache_key(
             'posts:list',
-            page=page,
+            scopes,
+            page=f"cursor:{cursor or 'first'}" if cursor_mode else page,
+            total=include_total,
             per_page=per_page,
             user_id=user_id or 'all',
             search=search or 'none',
@@ -102,88 +111,153 @@ def get_posts():
             tags=tags or 'none',
             visibility=visibility or 'all',
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            fields=','.join(fields)
         )
         
-        # Try to get from cache
-        cached_result = get_cached_data(cache_key, 60)  # 1 minute cache
-        if cached_result:
-            return jsonify(cached_result), 200
-        
-        # Build query with eager loading
-        query = Post.query.options(joinedload(Post.user)).filter_by(is_published=True)
-        
-        # Apply filters
-        if user_id:
-            query = query.filter_by(user_id=user_id)
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Post.content.ilike(search_term),
-                    Post.title.ilike(search_term),
-                    Post.tags.cast(String).ilike(search_term)
+        def apply_filters(query):
+            """Restrict a query on posts to this request's filters; returns (query, search scores)"""
+            query = query.filter(Post.is_published == True)
+            
+            if user_id:
+                query = query.filter(Post.user_id == user_id)
+            
+            scores = None
+            if search:
+                # Ranked lookup through the inverted index
+                scores = search_scores(search)
+                if scores is None:
+                    query = query.filter(false())
+                else:
+                    query = query.join(scores, scores.c.post_id == Post.id)
+            
+            if required_tags:
+                query = query.filter(Post.id.in_(posts_with_all_tags(required_tags)))
+            
+            if visibility == 'featured':
+                query = query.filter(Post.is_featured == True)
+            elif visibility == 'recent':
+                # Posts from last 7 days
+                week_ago = datetime.utcnow() - timedelta(days=7)
+                query = query.filter(Post.created_at >= week_ago)
+            
+            return query, scores
+        
+        def listing_version():
+            # cache_key carries the scope generations that every write to the matching set bumps;
+            # the newest updated_at (an index lookup on ix_posts_published_updated_at_id) covers
+            # in-place edits. Deliberately unfiltered: no COUNT and no search over the listing.
+            latest = db.session.query(func.max(Post.updated_at)).filter(Post.is_published == True).scalar()
+            return version_etag(cache_key, latest)
+        
+        def build_result():
+            # Select only the response columns as plain rows; the serializer is compiled once per field set
+            serialize = compile_row_serializer(fields)
+            query, scores = apply_filters(listing_query(fields))
+            
+            if sort_by == 'relevance':
+                if scores is None:
+                    sort_column = Post.created_at
+                else:
+                    sort_column = scores.c.score
+            elif sort_by != 'trending':
+                sort_column = getattr(Post, sort_by)
+            
+            if sort_by == 'trending':
+                # Walk the index from the top (at most TRENDING_MAX_SCAN entries), keeping posts that pass the filters
+                skip = (page - 1) * per_page
+                rows = []
+                for chunk in iter_trending(max(per_page + 1, 100)):
+                    chunk_ids = [post_id for post_id, _ in chunk]
+                    matches = {
+                        row[-1]: row for row in
+                        query.add_columns(Post.id).filter(Post.id.in_(chunk_ids)).all()
+                    }
+                    for post_id in chunk_ids:
+                        if post_id not in matches:
+                            continue
+                        if skip:
+                            skip -= 1
+                        else:
+                            rows.append(matches[post_id])
+                    if len(rows) > per_page:
+                        break
+                
+                posts_data = [serialize(row) for row in rows[:per_page]]
+                pagination = {
+                    'page': page,
+                    'per_page': per_page,
+                    'has_next': len(rows) > per_page,
+                    'has_prev': page > 1
+                }
+            elif cursor_mode:
+                # Keyset pagination: seek on (sort_column, id) and fetch one extra row to detect a next page
+                total = query.order_by(None).count() if include_total else None
+                # The id and sort value ride along as trailing columns for the next cursor
+                rows = (
+                    apply_keyset(query, sort_column, Post.id, sort_order, position)
+                    .add_columns(Post.id, sort_column)
+                    .limit(per_page + 1)
+                    .all()
                 )
-            )
-        
-        if category:
-            # For now, we'll use tags as categories
-            query = query.filter(Post.tags.cast(String).ilike(f"%{category}%"))
-        
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-            for tag in tag_list:
-                query = query.filter(Post.tags.cast(String).ilike(f"%{tag}%"))
-        
-        if visibility == 'featured':
-            query = query.filter_by(is_featured=True)
-        elif visibility == 'recent':
-            # Posts from last 7 days
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            query = query.filter(Post.created_at >= week_ago)
-        
-        # Apply sorting
-        sort_column = getattr(Post, sort_by)
-        if sort_order == 'desc':
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-        
-        # Paginate results
-        posts = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        # Format response
-        posts_data = [post.to_dict() for post in posts.items]
-        
-        result = {
-            'posts': posts_data,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': posts.total,
-                'pages': posts.pages,
-                'has_next': posts.has_next,
-                'has_prev': posts.has_prev
-            },
-            'filters': {
-                'search': search,
-                'category': category,
-                'tags': tags,
-                'visibility': visibility,
-                'sort_by': sort_by,
-                'sort_order': sort_order
+                has_next = len(rows) > per_page
+                rows = rows[:per_page]
+            
+                posts_data = [serialize(row) for row in rows]
+                pagination = {
+                    'mode': 'cursor',
+                    'per_page': per_page,
+                    'cursor': cursor or None,
+                    'next_cursor': encode_cursor(sort_by, sort_order, rows[-1][-1], rows[-1][-2]) if has_next else None,
+                    'has_next': has_next
+                }
+                if include_total:
+                    pagination['total'] = total
+            else:
+                # Apply sorting (id as tie-breaker keeps pages stable)
+                if sort_order == 'desc':
+                    query = query.order_by(desc(sort_column), desc(Post.id))
+                else:
+                    query = query.order_by(asc(sort_column), asc(Post.id))
+            
+                # Paginate results
+                posts = query.paginate(
+                    page=page, 
+                    per_page=per_page, 
+                    error_out=False
+                )
+            
+                posts_data = [serialize(row) for row in posts.items]
+                pagination = {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': posts.total,
+                    'pages': posts.pages,
+                    'has_next': posts.has_next,
+                    'has_prev': posts.has_prev
+                }
+            
+            # Format response
+            result = {
+                'posts': posts_data,
+                'pagination': pagination,
+                'filters': {
+                    'search': search,
+                    'category': category,
+                    'tags': tags,
+                    'visibility': visibility,
+                    'sort_by': sort_by,
+                    'sort_order': sort_order
+                }
             }
-        }
-        
-        # Cache the result
-        set_cached_data(cache_key, result, 60)
-        
-        return jsonify(result), 200
+            
+            return result
+            
+        # Serve from cache (1 minute); on a miss only one caller runs the query, and an
+        # If-None-Match matching the current version gets a 304 without building the page
+        # Trending order moves with every view, so it is not covered by the listing version
+        version = None if sort_by == 'trending' else listing_version
+        return get_or_compute_response(cache_key, build_result, 60, version=version).to_response()
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch posts: {str(e)}'}), 500
@@ -196,42 +270,23 @@ def get_categories():
         return '', 200
     
     try:
-        # Try to get from cache
-        cache_key = 'posts:categories'
-        cached_result = get_cached_data(cache_key, 300)  # 5 minutes cache
-        if cached_result:
-            return jsonify(cached_result), 200
-        
-        # Get all unique tags from posts
-        posts = Post.query.filter_by(is_published=True).all()
-        all_tags = []
-        for post in posts:
-            if post.tags:
-                all_tags.extend(post.tags)
-        
-        # Count tag frequency
-        tag_counts = {}
-        for tag in all_tags:
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Sort by frequency and get top 20
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:20]
-        
-        categories = [
-            {
-                'name': tag,
-                'count': count,
-                'slug': tag.lower().replace(' ', '-')
-            }
-            for tag, count in sorted_tags
-        ]
-        
-        result = {'categories': categories}
-        
-        # Cache the result
-        set_cached_data(cache_key, result, 300)
-        
-        return jsonify(result), 200
+        cache_key = get_scoped_cache_key('posts:categories', ['tags'])
+        
+        def build_result():
+            # Top 20 tags from the incrementally maintained counts
+            categories = [
+                {
+                    'name': tag.name,
+                    'count': tag.post_count,
+                    'slug': tag.tag.replace(' ', '-')
+                }
+                for tag in top_tags(20)
+            ]
+            
+            return {'categories': categories}
+            
+        # Serve from cache (5 minutes); on a miss only one caller recomputes
+        return get_or_compute_response(cache_key, build_result, 300).to_response()
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch categories: {str(e)}'}), 500
@@ -244,42 +299,23 @@ def get_popular_tags():
         return '', 200
     
     try:
-        # Try to get from cache
-        cache_key = 'posts:popular_tags'
-        cached_result = get_cached_data(cache_key, 600)  # 10 minutes cache
-        if cached_result:
-            return jsonify(cached_result), 200
-        
-        # Get all unique tags from posts
-        posts = Post.query.filter_by(is_published=True).all()
-        all_tags = []
-        for post in posts:
-            if post.tags:
-                all_tags.extend(post.tags)
-        
-        # Count tag frequency
-        tag_counts = {}
-        for tag in all_tags:
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Sort by frequency and get top 15
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:15]
-        
-        popular_tags = [
-            {
-                'tag': tag,
-                'count': count,
-                'slug': tag.lower().replace(' ', '-')
-            }
-            for tag, count in sorted_tags
-        ]
-        
-        result = {'popular_tags': popular_tags}
-        
-        # Cache the result
-        set_cached_data(cache_key, result, 600)
-        
-        return jsonify(result), 200
+        cache_key = get_scoped_cache_key('posts:popular_tags', ['tags'])
+        
+        def build_result():
+            # Top 15 tags from the incrementally maintained counts
+            popular_tags = [
+                {
+                    'tag': tag.name,
+                    'count': tag.post_count,
+                    'slug': tag.tag.replace(' ', '-')
+                }
+                for tag in top_tags(15)
+            ]
+            
+            return {'popular_tags': popular_tags}
+            
+        # Serve from cache (10 minutes); on a miss only one caller recomputes
+        return get_or_compute_response(cache_key, build_result, 600).to_response()
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch popular tags: {str(e)}'}), 500
@@ -292,41 +328,14 @@ def get_posts_stats():
         return '', 200
     
     try:
-        # Try to get from cache
-        cache_key = 'posts:stats'
-        cached_result = get_cached_data(cache_key, 300)  # 5 minutes cache
-        if cached_result:
-            return jsonify(cached_result), 200
-        
-        # Calculate statistics
-        total_posts = Post.query.filter_by(is_published=True).count()
-        featured_posts = Post.query.filter_by(is_published=True, is_featured=True).count()
-        
-        # Posts from last 7 days
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_posts = Post.query.filter(
-            Post.is_published == True,
-            Post.created_at >= week_ago
-        ).count()
-        
-        # Total engagement
-        total_likes = db.session.query(func.sum(Post.likes_count)).filter_by(is_published=True).scalar() or 0
-        total_views = db.session.query(func.sum(Post.views_count)).filter_by(is_published=True).scalar() or 0
-        
-        stats = {
-            'total_posts': total_posts,
-            'featured_posts': featured_posts,
-            'recent_posts': recent_posts,
-            'total_likes': total_likes,
-            'total_views': total_views
-        }
-        
-        result = {'stats': stats}
-        
-        # Cache the result
-        set_cached_data(cache_key, result, 300)
-        
-        return jsonify(result), 200
+        cache_key = get_scoped_cache_key('posts:stats', ['stats'])
+        
+        def build_result():
+            # Read the materialized counters maintained by the write paths
+            return {'stats': read_post_stats()}
+            
+        # Serve from cache (5 minutes); on a miss only one caller recomputes
+        return get_or_compute_response(cache_key, build_result, 300).to_response()
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch stats: {str(e)}'}), 500
@@ -395,10 +404,22 @@ def create_post():
         )
         
         db.session.add(post)
+        db.session.flush()
+        index_post(post)
+        sync_post_tags(post)
+        new_counted_tags = counted_tags(post)
+        update_tag_counts({}, new_counted_tags)
+        update_post_stats(stats_snapshot(None), stats_snapshot(post))
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache_pattern('posts:*')
+        # Invalidate only the cache scopes this post belongs to
+        scopes = post_cache_scopes(post) | {'stats'}
+        if new_counted_tags:
+            scopes.add('tags')
+        bump_generations(scopes)
+        delete_cached_data(missing_post_cache_key(post.id))
+        if post.is_published:
+            fan_out(post.user_id, [post.id])
         
         return jsonify({
             'message': 'Post created successfully',
@@ -409,6 +430,118 @@ def create_post():
         db.session.rollback()
         return jsonify({'error': f'Failed to create post: {str(e)}'}), 500
 
+@posts_bp.route('/bulk', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def bulk_create_posts():
+    """Create many posts at once from JSON: {"posts": [{"content", "title", "tags", ...}]}"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        user_id = int(get_jwt_identity())
+        if not User.query.get(user_id):
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        items = data.get('posts')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'posts must be a non-empty list'}), 400
+        
+        # All or nothing: one invalid post rejects the batch
+        result = import_posts(user_id, items)
+        
+        return jsonify({
+            'message': f"Created {result['created']} posts",
+            **result
+        }), 201
+        
+    except PostImportError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to import posts: {str(e)}'}), 500
+
+@posts_bp.route('/export', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def export_posts():
+    """Stream published posts as NDJSON in id order (?after_id= resumes, ?user_id=, ?fields=)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    after_id = request.args.get('after_id', 0, type=int)
+    user_id = request.args.get('user_id', type=int)
+    chunk_size = min(max(request.args.get('chunk_size', EXPORT_CHUNK_SIZE, type=int), 1), MAX_EXPORT_CHUNK_SIZE)
+    try:
+        fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+    except InvalidFieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Every line carries the post id; a client that is cut off resumes with after_id=<last id>
+    lines = iter_ndjson(iter_posts(after_id, fields, user_id, chunk_size))
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+@posts_bp.route('/batch', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_posts_batch():
+    """Get several posts by ID (?ids=3,1,2), returned in the requested order"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        try:
+            post_ids = list(dict.fromkeys(
+                int(pid) for pid in request.args.get('ids', '').split(',') if pid.strip()
+            ))
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+        
+        if len(post_ids) > 100:
+            return jsonify({'error': 'At most 100 ids per request'}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+        except InvalidFieldsError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        posts_by_id = get_posts_by_ids(post_ids, fields)
+        
+        return jsonify({
+            'posts': [posts_by_id[pid] for pid in post_ids if pid in posts_by_id],
+            'missing': [pid for pid in post_ids if pid not in posts_by_id]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch posts: {str(e)}'}), 500
+
+@posts_bp.route('/trending', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_trending_posts():
+    """Top posts by time-decayed engagement (?limit=20), each with its current trending_score"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        try:
+            fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+        except InvalidFieldsError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Deleted or unpublished posts drop out while hydrating, so keep reading until the list is full
+        posts = []
+        for chunk in iter_trending(limit + 10):
+            found = get_posts_by_ids([post_id for post_id, _ in chunk], fields)
+            for post_id, score in chunk:
+                if post_id in found and len(posts) < limit:
+                    posts.append(dict(found[post_id], trending_score=round(score, 4)))
+            if len(posts) == limit:
+                break
+
+        return jsonify({'posts': posts}), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch trending posts: {str(e)}'}), 500
+
 @posts_bp.route('/<int:post_id>', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_post(post_id):
@@ -417,23 +550,90 @@ def get_post(post_id):
         return '', 200
     
     try:
-        post = Post.query.get(post_id)
+        # Negative cache: IDs that recently did not resolve skip the database
+        missing_key = missing_post_cache_key(post_id)
+        missing = get_cached_data(missing_key, Config.CACHE_NEGATIVE_TTL)
+        if missing:
+            return jsonify({'error': missing['error']}), 404
         
-        if not post:
-            return jsonify({'error': 'Post not found'}), 404
+        try:
+            fields = parse_fields(request.args.get('fields'), ALL_POST_FIELDS) or ALL_POST_FIELDS
+        except InvalidFieldsError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        cache_key = get_scoped_cache_key('posts:detail', [f'post:{post_id}'], id=post_id, fields=','.join(fields))
+        
+        def build_result():
+            # is_published rides along as a trailing column so it can be checked whatever fields are selected
+            row = (
+                listing_query(fields)
+                .add_columns(Post.is_published)
+                .filter(Post.id == post_id)
+                .first()
+            )
+            
+            if not row:
+                raise PostUnavailable('Post not found')
+            
+            if not row[-1]:
+                raise PostUnavailable('Post not available')
+            
+            return {'post': compile_row_serializer(fields)(row)}
         
-        if not post.is_published:
-            return jsonify({'error': 'Post not available'}), 404
+        def post_version():
+            # Counter updates go through UPDATE statements too, so updated_at moves with every change
+            row = db.session.query(Post.updated_at, Post.is_published).filter(Post.id == post_id).first()
+            if not row or not row.is_published:
+                return None
+            return version_etag(cache_key, row.updated_at)
         
-        # Increment view count
-        post.views_count += 1
-        db.session.commit()
+        # Read-only and cacheable (1 minute); the view is buffered and flushed in batches
+        cached_response = get_or_compute_response(cache_key, build_result, 60, version=post_version)
+        record_view(post_id)
+        record_viewer(post_id, get_jwt_identity())
         
-        return jsonify({'post': post.to_dict()}), 200
+        return cached_response.to_response()
         
+    except PostUnavailable as e:
+        set_cached_data(missing_key, {'error': str(e)}, Config.CACHE_NEGATIVE_TTL)
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': f'Failed to fetch post: {str(e)}'}), 500
 
+@posts_bp.route('/<int:post_id>/views', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_post_views(post_id):
+    """View totals plus daily unique viewer estimates (?days=7, max 90)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        days = min(max(request.args.get('days', 7, type=int), 1), 90)
+        cache_key = get_scoped_cache_key('posts:views', [f'post:{post_id}'], id=post_id, days=days)
+        
+        def build_result():
+            post = Post.query.get(post_id)
+            
+            if not post or not post.is_published:
+                raise PostUnavailable('Post not found')
+            
+            window = daily_unique_viewers(post_id, days)
+            return {
+                'post_id': post_id,
+                'views_count': post.views_count,
+                'unique_viewers': post.unique_viewers or 0,
+                'window': {'days': days, 'unique_viewers': window['unique_viewers']},
+                'daily': window['days']
+            }
+        
+        # Sketches are flushed in the background, so a short TTL is enough
+        return get_or_compute_response(cache_key, build_result, 60).to_response()
+        
+    except PostUnavailable as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch post views: {str(e)}'}), 500
+
 @posts_bp.route('/<int:post_id>', methods=['PUT', 'OPTIONS'])
 @jwt_required()
 def update_post(post_id):
@@ -448,11 +648,14 @@ def update_post(post_id):
         if not post:
             return jsonify({'error': 'Post not found'}), 404
         
-        if post.user_id != user_id:
+        if str(post.user_id) != str(user_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
         # Get form data
         data = request.get_json() or {}
+        old_counted_tags = counted_tags(post)
+        old_stats = stats_snapshot(post)
+        old_scopes = post_cache_scopes(post)
         
         # Update allowed fields
         if 'content' in data:
@@ -470,10 +673,28 @@ def update_post(post_id):
         if 'is_published' in data:
             post.is_published = bool(data['is_published'])
         
+        if 'content' in data or 'title' in data or 'tags' in data:
+            index_post(post)
+        
+        if 'tags' in data:
+            sync_post_tags(post)
+        
+        new_counted_tags = counted_tags(post)
+        update_tag_counts(old_counted_tags, new_counted_tags)
+        update_post_stats(old_stats, stats_snapshot(post))
+        
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache_pattern('posts:*')
+        # Invalidate the scopes the post belonged to before and after the edit
+        scopes = old_scopes | post_cache_scopes(post) | {'stats'}
+        if old_counted_tags != new_counted_tags:
+            scopes.add('tags')
+        bump_generations(scopes)
+        if post.is_published:
+            delete_cached_data(missing_post_cache_key(post.id))
+            if not old_stats['total_posts']:
+                # Just published: deliver it to followers' timelines now
+                fan_out(post.user_id, [post.id])
         
         return jsonify({
             'message': 'Post updated successfully',
@@ -498,7 +719,7 @@ def delete_post(post_id):
         if not post:
             return jsonify({'error': 'Post not found'}), 404
         
-        if post.user_id != user_id:
+        if str(post.user_id) != str(user_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
         # Delete associated media files
@@ -508,11 +729,23 @@ def delete_post(post_id):
             full_path = os.path.join(Config.UPLOAD_FOLDER, media_path)
             MediaProcessor.delete_media_file(full_path)
         
+        remove_post(post.id)
+        remove_post_tags(post.id)
+        remove_post_likes(post.id)
+        remove_post_view_sketches(post.id)
+        old_counted_tags = counted_tags(post)
+        scopes = post_cache_scopes(post) | {'stats'}
+        if old_counted_tags:
+            scopes.add('tags')
+        
+        update_tag_counts(old_counted_tags, {})
+        update_post_stats(stats_snapshot(post), stats_snapshot(None))
         db.session.delete(post)
         db.session.commit()
         
         # Invalidate cache
-        invalidate_cache_pattern('posts:*')
+        bump_generations(scopes)
+        remove_trending(post_id)
         
         return jsonify({'message': 'Post deleted successfully'}), 200
         
@@ -523,28 +756,97 @@ def delete_post(post_id):
 @posts_bp.route('/<int:post_id>/like', methods=['POST', 'OPTIONS'])
 @jwt_required()
 def like_post(post_id):
-    """Like/unlike a post"""
+    """Like a post (idempotent)"""
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        user_id = int(get_jwt_identity())
         post = Post.query.get(post_id)
         
         if not post:
             return jsonify({'error': 'Post not found'}), 404
         
-        # Toggle like (simple implementation)
-        post.likes_count += 1
+        changed, sharded = like(user_id, post_id)
+        if changed and post.is_published:
+            bump_post_stats(total_likes=1)
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache_pattern('posts:*')
+        # Only the post itself and stats are invalidated; listings pick up the count within their TTL.
+        # Hot (sharded) posts are left to the cache TTL entirely.
+        if changed and not sharded:
+            bump_generations(post_counter_scopes([post_id]))
+        if changed and post.is_published:
+            record_trending_event(post_id, 'like')
         
         return jsonify({
             'message': 'Post liked successfully',
-            'likes_count': post.likes_count
+            'liked': True,
+            'likes_count': like_counts([post_id]).get(post_id, 0)
         }), 200
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': f'Failed to like post: {str(e)}'}), 500 
\ No newline at end of file
+        return jsonify({'error': f'Failed to like post: {str(e)}'}), 500
+
+@posts_bp.route('/<int:post_id>/like', methods=['DELETE', 'OPTIONS'])
+@jwt_required()
+def unlike_post(post_id):
+    """Remove the current user's like from a post (idempotent)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        user_id = int(get_jwt_identity())
+        post = Post.query.get(post_id)
+        
+        if not post:
+            return jsonify({'error': 'Post not found'}), 404
+        
+        changed, sharded = unlike(user_id, post_id)
+        if changed and post.is_published:
+            bump_post_stats(total_likes=-1)
+        db.session.commit()
+        
+        if changed and not sharded:
+            bump_generations(post_counter_scopes([post_id]))
+        
+        return jsonify({
+            'message': 'Post unliked successfully',
+            'liked': False,
+            'likes_count': like_counts([post_id]).get(post_id, 0)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to unlike post: {str(e)}'}), 500
+
+@posts_bp.route('/liked', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_liked_posts():
+    """Which of the given posts the current user has liked (?ids=1,2,3)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        user_id = int(get_jwt_identity())
+        try:
+            post_ids = [int(pid) for pid in request.args.get('ids', '').split(',') if pid.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+        
+        if len(post_ids) > 100:
+            return jsonify({'error': 'At most 100 ids per request'}), 400
+        
+        liked = liked_post_ids(user_id, post_ids)
+        counts = like_counts(post_ids)
+        
+        return jsonify({
+            'likes': {
+                str(pid): {'liked': pid in liked, 'likes_count': counts.get(pid, 0)}
+                for pid in post_ids if pid in counts
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch likes: {str(e)}'}), 500
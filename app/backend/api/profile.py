@@ -3,11 +3,18 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User, db
 from models.profile import Profile, Skill, Experience, Education
 from utils.image_processor import save_uploaded_file, delete_profile_image
+from utils.fieldsets import parse_fields, InvalidFieldsError
+from utils.response_cache import version_etag, matching_etag, not_modified_response
+from utils.cache import bump_generations, get_generations
 import os
 from config import Config
 
 profile_bp = Blueprint('profile', __name__)
  
+def profile_scope(user_id):
+    """Cache scope versioning a user's profile response"""
+    return f'profile:{user_id}'
+
 def get_or_create_profile(user_id):
     profile = Profile.query.filter_by(user_id=user_id).first()
     if not profile:
@@ -16,6 +23,29 @@ def get_or_create_profile(user_id):
         db.session.commit()
     return profile
 
+# Columns read from users for each profile field (fields= on GET /api/profile)
+PROFILE_USER_COLUMNS = {
+    'id': User.id,
+    'username': User.username,
+    'email': User.email,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'profile_image': User.profile_image,
+    'phone': User.phone,
+    'website': User.website,
+    'headline': User.headline,
+    'industry': User.industry,
+    'company': User.company,
+    'job_title': User.job_title,
+    'created_at': User.created_at,
+    'updated_at': User.updated_at,
+}
+PROFILE_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'profile_image', 'phone',
+    'website', 'headline', 'industry', 'company', 'job_title', 'bio', 'location',
+    'skills', 'experiences', 'educations', 'created_at', 'updated_at'
+)
+
 @profile_bp.route('', methods=['GET', 'OPTIONS'])
 @profile_bp.route('/', methods=['GET', 'OPTIONS'])
 @jwt_required()
@@ -23,53 +53,67 @@ def get_profile():
     if request.method == 'OPTIONS':
         return '', 200
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), PROFILE_FIELDS) or PROFILE_FIELDS
+    except InvalidFieldsError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Profile writes bump the profile:<id> generation, which versions the whole response along
+    # with users.updated_at (only second precision); a matching If-None-Match skips building it
+    updated_at = db.session.query(User.updated_at).filter(User.id == user_id).scalar()
+    generation = get_generations([profile_scope(user_id)])[0]
+    etag = version_etag('profile', user_id, updated_at, generation, ','.join(fields))
+    matched = matching_etag(etag)
+    if matched:
+        return not_modified_response(matched)
+
+    # Only the requested user columns are selected, and profile tables are only read when needed
+    user_fields = [field for field in fields if field in PROFILE_USER_COLUMNS]
+    user = db.session.query(*(PROFILE_USER_COLUMNS[field] for field in user_fields)).filter(User.id == user_id).first()
     if not user:
         return jsonify({'error': 'User not found'}), 404
+    profile_data = dict(zip(user_fields, user))
+    for field in ('created_at', 'updated_at'):
+        if field in profile_data:
+            profile_data[field] = profile_data[field].isoformat() if profile_data[field] else None
+
+    if not {'bio', 'location', 'skills', 'experiences', 'educations'}.intersection(fields):
+        response = jsonify(profile_data)
+        response.set_etag(etag)
+        return response, 200
+
     profile = get_or_create_profile(user_id)
-    skills = [s.name for s in Skill.query.filter_by(profile_id=profile.id).all()]
-    experiences = [
-        {
-            'id': e.id,
-            'title': e.title,
-            'company': e.company,
-            'start_date': e.start_date.isoformat() if e.start_date else None,
-            'end_date': e.end_date.isoformat() if e.end_date else None,
-            'description': e.description
-        } for e in Experience.query.filter_by(profile_id=profile.id).all()
-    ]
-    educations = [
-        {
-            'id': ed.id,
-            'school': ed.school,
-            'degree': ed.degree,
-            'field': ed.field,
-            'start_date': ed.start_date.isoformat() if ed.start_date else None,
-            'end_date': ed.end_date.isoformat() if ed.end_date else None
-        } for ed in Education.query.filter_by(profile_id=profile.id).all()
-    ]
-    profile_data = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'profile_image': user.profile_image,
-        'phone': user.phone,
-        'website': user.website,
-        'headline': user.headline,
-        'industry': user.industry,
-        'company': user.company,
-        'job_title': user.job_title,
-        'bio': profile.bio,
-        'location': profile.location,
-        'skills': skills,
-        'experiences': experiences,
-        'educations': educations,
-        'created_at': user.created_at.isoformat() if user.created_at else None,
-        'updated_at': user.updated_at.isoformat() if user.updated_at else None
-    }
-    return jsonify(profile_data), 200
+    if 'bio' in fields:
+        profile_data['bio'] = profile.bio
+    if 'location' in fields:
+        profile_data['location'] = profile.location
+    if 'skills' in fields:
+        profile_data['skills'] = [name for (name,) in db.session.query(Skill.name).filter_by(profile_id=profile.id).all()]
+    if 'experiences' in fields:
+        profile_data['experiences'] = [
+            {
+                'id': e.id,
+                'title': e.title,
+                'company': e.company,
+                'start_date': e.start_date.isoformat() if e.start_date else None,
+                'end_date': e.end_date.isoformat() if e.end_date else None,
+                'description': e.description
+            } for e in Experience.query.filter_by(profile_id=profile.id).all()
+        ]
+    if 'educations' in fields:
+        profile_data['educations'] = [
+            {
+                'id': ed.id,
+                'school': ed.school,
+                'degree': ed.degree,
+                'field': ed.field,
+                'start_date': ed.start_date.isoformat() if ed.start_date else None,
+                'end_date': ed.end_date.isoformat() if ed.end_date else None
+            } for ed in Education.query.filter_by(profile_id=profile.id).all()
+        ]
+    response = jsonify(profile_data)
+    response.set_etag(etag)
+    return response, 200
 
 @profile_bp.route('', methods=['PUT', 'OPTIONS'])
 @profile_bp.route('/', methods=['PUT', 'OPTIONS'])
@@ -135,6 +179,7 @@ def update_profile():
                 ))
     
     db.session.commit()
+    bump_generations({profile_scope(user_id)})
     return jsonify({'message': 'Profile updated successfully'}), 200
 
 @profile_bp.route('/image', methods=['POST', 'OPTIONS'])
@@ -164,6 +209,7 @@ def upload_profile_image():
     # Update user profile image
     user.profile_image = result
     db.session.commit()
+    bump_generations({profile_scope(user_id)})
     
     return jsonify({
         'message': 'Profile image uploaded successfully',
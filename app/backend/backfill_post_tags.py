@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Post Tags Backfill Script
+Copies tags from the JSON posts.tags column into the normalized post_tags table
+and recomputes the tag_counts aggregate used by /categories and /popular-tags.
+Safe to run repeatedly: each post's tag rows are brought in line with its JSON tags.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from utils.post_tags import backfill_post_tags, rebuild_tag_counts
+
+def backfill():
+    """Backfill post_tags from existing posts"""
+    with app.app_context():
+        print("🔄 Backfilling post tags...")
+        db.create_all()
+        count = backfill_post_tags()
+        print(f"✅ Synced tags for {count} posts")
+        tag_count = rebuild_tag_counts()
+        print(f"✅ Recounted {tag_count} distinct tags")
+
+if __name__ == "__main__":
+    try:
+        backfill()
+    except Exception as e:
+        print(f"❌ Error backfilling post tags: {e}")
+        sys.exit(1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Post Listing Benchmark
+Compares the ORM listing path (Post objects + joinedload(Post.user) + to_dict)
+with the lean projection path (selected columns + compiled row serializer).
+Reports per-page time and peak allocated memory for query + serialization
+and for serialization alone.
+
+Sample posts are inserted inside a transaction that is rolled back at the
+end, so the database is left untouched.
+
+Usage: python bench_post_listing.py [--posts 2000] [--per-page 50] [--pages 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from models.user import User
+from models.post import Post
+from utils.post_projection import listing_query, compile_row_serializer
+
+def seed(count):
+    """Insert sample posts (and an author) without committing"""
+    author = User.query.first()
+    if author is None:
+        author = User(username='bench_author', email='bench_author@example.com',
+                      first_name='Bench', last_name='Author', password_hash='x')
+        db.session.add(author)
+        db.session.flush()
+
+    now = datetime.utcnow()
+    db.session.execute(Post.__table__.insert(), [
+        {
+            'user_id': author.id,
+            'title': f'Benchmark post {i}',
+            'content': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8,
+            'tags': ['benchmark', f'tag{i % 10}'],
+            'media_metadata': {'width': 1280, 'height': 720},
+            'is_published': True,
+            'is_featured': i % 7 == 0,
+            'likes_count': i % 100,
+            'views_count': i * 3,
+            'created_at': now - timedelta(seconds=i),
+            'updated_at': now - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ])
+    db.session.flush()
+
+def orm_page(page, per_page):
+    return (
+        Post.query.options(joinedload(Post.user))
+        .filter_by(is_published=True)
+        .order_by(desc(Post.created_at), desc(Post.id))
+        .offset(page * per_page).limit(per_page).all()
+    )
+
+def lean_page(page, per_page):
+    return (
+        listing_query()
+        .filter(Post.is_published == True)
+        .order_by(desc(Post.created_at), desc(Post.id))
+        .offset(page * per_page).limit(per_page).all()
+    )
+
+def measure(label, pages, fetch, serialize):
+    """Median time and peak memory per page, with and without the query
+
+    Times come from a pass without tracemalloc, which would otherwise slow
+    down allocation-heavy code disproportionately; memory from a second pass.
+    """
+    total_times, serialize_times, total_peaks, serialize_peaks = [], [], [], []
+    for page in range(pages):
+        # Start every page from an empty identity map, as a fresh request would
+        db.session.expunge_all()
+        started = time.perf_counter()
+        rows = fetch(page)
+        fetched = time.perf_counter()
+        data = [serialize(row) for row in rows]
+        finished = time.perf_counter()
+        total_times.append((finished - started) * 1000)
+        serialize_times.append((finished - fetched) * 1000)
+        del rows, data
+
+    for page in range(pages):
+        db.session.expunge_all()
+        tracemalloc.start()
+        rows = fetch(page)
+        _, fetch_peak = tracemalloc.get_traced_memory()
+        before_serialize, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        data = [serialize(row) for row in rows]
+        _, serialize_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total_peaks.append(max(fetch_peak, serialize_peak) / 1024)
+        serialize_peaks.append((serialize_peak - before_serialize) / 1024)
+        del rows, data
+
+    print(f"{label:<6} query+serialize {statistics.median(total_times):7.3f} ms  "
+          f"peak {statistics.median(total_peaks):7.1f} KiB | "
+          f"serialize only {statistics.median(serialize_times):7.3f} ms  "
+          f"peak {statistics.median(serialize_peaks):7.1f} KiB")
+    return statistics.median(total_times), statistics.median(serialize_times)
+
+def run_benchmark(post_count, per_page, pages):
+    with app.app_context():
+        db.create_all()
+        try:
+            print(f"🔄 Seeding {post_count} sample posts (rolled back afterwards)...")
+            seed(post_count)
+            pages = min(pages, max(post_count // per_page, 1))
+            print(f"📊 {pages} pages of {per_page} posts, median per page:")
+
+            serialize = compile_row_serializer()
+            orm_total, orm_serialize = measure(
+                'ORM', pages, lambda page: orm_page(page, per_page), lambda post: post.to_dict()
+            )
+            lean_total, lean_serialize = measure(
+                'Lean', pages, lambda page: lean_page(page, per_page), serialize
+            )
+            print(f"✅ Lean path is {orm_total / lean_total:.1f}x faster per page "
+                  f"({orm_serialize / lean_serialize:.1f}x for serialization alone)")
+        finally:
+            db.session.rollback()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=2000, help='sample posts to insert')
+    parser.add_argument('--per-page', type=int, default=50, help='posts per page')
+    parser.add_argument('--pages', type=int, default=200, help='pages to measure per path')
+    args = parser.parse_args()
+    try:
+        run_benchmark(args.posts, args.per_page, args.pages)
+    except Exception as e:
+        print(f"❌ Error running benchmark: {e}")
+        sys.exit(1)
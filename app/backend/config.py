@@ -66,6 +66,61 @@ class Config:
     # CORS
     CORS_HEADERS = 'Content-Type' 
     
+    # Caching (Redis L2 with an in-process L1 in front of it)
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_L1_MAX_ENTRIES = int(os.environ.get('CACHE_L1_MAX_ENTRIES', 2048))
+    CACHE_L1_TTL = int(os.environ.get('CACHE_L1_TTL', 10))  # Upper bound on L1 staleness, in seconds
+    CACHE_INVALIDATION_CHANNEL = 'cache:invalidate'
+    CACHE_REDIS_MAX_CONNECTIONS = int(os.environ.get('CACHE_REDIS_MAX_CONNECTIONS', 50))
+    CACHE_REDIS_SOCKET_TIMEOUT = float(os.environ.get('CACHE_REDIS_SOCKET_TIMEOUT', 0.1))  # Seconds
+    CACHE_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CACHE_BREAKER_FAILURE_THRESHOLD', 5))
+    CACHE_BREAKER_RESET_TIMEOUT = float(os.environ.get('CACHE_BREAKER_RESET_TIMEOUT', 10))  # Seconds before a half-open probe
+    CACHE_NEGATIVE_TTL = int(os.environ.get('CACHE_NEGATIVE_TTL', 30))  # How long "post not found" answers are cached
+    
+    # Post views are buffered and written to the database in batches
+    VIEW_FLUSH_INTERVAL = int(os.environ.get('VIEW_FLUSH_INTERVAL', 10))  # Seconds
+    
+    # Like counters: posts liked more often than this per minute spread updates over shard rows
+    LIKE_COUNTER_SHARDS = int(os.environ.get('LIKE_COUNTER_SHARDS', 16))
+    HOT_POST_LIKES_PER_MINUTE = int(os.environ.get('HOT_POST_LIKES_PER_MINUTE', 60))
+    
+    # Trending index: engagement events scored with exponential decay (see utils/trending.py)
+    TRENDING_HALF_LIFE = int(os.environ.get('TRENDING_HALF_LIFE', 6 * 3600))  # Seconds for an event's weight to halve
+    TRENDING_RESCALE_INTERVAL = int(os.environ.get('TRENDING_RESCALE_INTERVAL', 3600))  # Seconds between rescales
+    TRENDING_MAX_POSTS = int(os.environ.get('TRENDING_MAX_POSTS', 10000))  # Posts kept in the index
+    TRENDING_MAX_SCAN = int(os.environ.get('TRENDING_MAX_SCAN', 1000))  # Index entries one request may walk
+    TRENDING_EVENT_WEIGHTS = {'view': 1.0, 'like': 5.0, 'comment': 8.0, 'share': 10.0}
+    
+    # Home timelines: post ids pushed to followers on write, newest first, capped per user
+    TIMELINE_MAX_LENGTH = int(os.environ.get('TIMELINE_MAX_LENGTH', 800))
+    TIMELINE_TTL = int(os.environ.get('TIMELINE_TTL', 7 * 24 * 3600))  # Seconds; idle timelines are rebuilt on next read
+    TIMELINE_FANOUT_BATCH = int(os.environ.get('TIMELINE_FANOUT_BATCH', 1000))  # Followers per Redis pipeline
+    # Authors with more followers than this are not fanned out; their recent posts are merged in at read time
+    FEED_FANOUT_FOLLOWER_THRESHOLD = int(os.environ.get('FEED_FANOUT_FOLLOWER_THRESHOLD', 10000))
+    FEED_PULL_RECENT_POSTS = int(os.environ.get('FEED_PULL_RECENT_POSTS', 200))  # Recent posts read per pulled author
+
+    # Ranked feed (?order=ranked): weight per ranking feature, see utils/feed_ranking.py
+    FEED_RANKING_WEIGHTS = {
+        'recency': 4.0,
+        'likes': 1.0,
+        'comments': 1.5,
+        'shares': 2.0,
+        'affinity': 1.0,
+        'tag_overlap': 0.5,
+    }
+    FEED_RANKING_HALF_LIFE = int(os.environ.get('FEED_RANKING_HALF_LIFE', 12 * 3600))  # Seconds for recency to halve
+    FEED_RANKING_SIGNAL_LIKES = 200  # Viewer's recent likes used for author affinity and tag interest
+    
+    # Response compression (cached responses store precompressed variants, everything else
+    # is compressed on the way out); higher levels trade CPU for fewer bytes
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # Bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))  # 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))  # 0-11
+    COMPRESSION_MIMETYPES = {
+        'application/json', 'application/javascript', 'text/html', 'text/css',
+        'text/plain', 'text/xml', 'application/xml', 'image/svg+xml'
+    }
+    
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Post Export Script
+Writes every published post as one JSON document per line (NDJSON), walking
+the posts table in id order with constant memory. An interrupted export can
+be continued with --resume (reads the last id from the output file) or
+--after-id.
+
+Usage: python export_posts.py --output posts.ndjson [--resume] [--fields id,title]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app
+from utils.fieldsets import parse_fields
+from utils.post_export import iter_posts, iter_ndjson, EXPORT_CHUNK_SIZE
+from utils.post_projection import ALL_POST_FIELDS
+
+def last_exported_id(path):
+    """Id of the last complete line in an existing export file (0 if none)"""
+    if not os.path.exists(path):
+        return 0
+    last_line = None
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.endswith(b'\n'):
+                last_line = line
+    return json.loads(last_line)['id'] if last_line else 0
+
+def truncate_partial_line(path):
+    """Drop a trailing line that was cut off mid-write"""
+    with open(path, 'rb+') as f:
+        data_end = f.seek(0, os.SEEK_END)
+        position = data_end
+        while position > 0:
+            f.seek(position - 1)
+            if f.read(1) == b'\n':
+                break
+            position -= 1
+        if position != data_end:
+            f.truncate(position)
+
+def export_posts(output, after_id, fields, user_id, chunk_size):
+    with app.app_context():
+        started = time.perf_counter()
+        count = 0
+        for line in iter_ndjson(iter_posts(after_id, fields, user_id, chunk_size)):
+            output.write(line)
+            count += 1
+            if count % 10000 == 0:
+                print(f"… {count} posts", file=sys.stderr)
+        output.flush()
+        elapsed = time.perf_counter() - started
+        print(f"✅ Exported {count} posts in {elapsed:.1f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export published posts as NDJSON")
+    parser.add_argument('--output', default='-', help="Output file (default: stdout)")
+    parser.add_argument('--after-id', type=int, default=0, help="Start after this post id")
+    parser.add_argument('--resume', action='store_true',
+                        help="Append to --output, continuing after its last exported post")
+    parser.add_argument('--fields', default='', help="Comma-separated fields to export (default: all)")
+    parser.add_argument('--user-id', type=int, help="Only export posts by this user")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows per keyset chunk")
+    args = parser.parse_args()
+
+    try:
+        fields = parse_fields(args.fields, ALL_POST_FIELDS) or ALL_POST_FIELDS
+        after_id = args.after_id
+        if args.output == '-':
+            export_posts(sys.stdout, after_id, fields, args.user_id, args.chunk_size)
+        else:
+            if args.resume and os.path.exists(args.output):
+                truncate_partial_line(args.output)
+                after_id = max(after_id, last_exported_id(args.output))
+                print(f"🔄 Resuming after post {after_id}", file=sys.stderr)
+            with open(args.output, 'a' if args.resume else 'w', encoding='utf-8') as output:
+                export_posts(output, after_id, fields, args.user_id, args.chunk_size)
+    except Exception as e:
+        print(f"❌ Error exporting posts: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Post Import Script
+Creates posts in bulk from an NDJSON file (one post object per line, e.g. the
+output of export_posts.py) for a single author. Posts are validated and
+inserted in batches; each batch is one transaction with one round of search,
+tag, stats and cache maintenance.
+
+Usage: python import_posts.py posts.ndjson --user-id 1 [--batch-size 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from models.user import User
+from utils.post_import import import_posts, PostImportError, IMPORT_CHUNK_SIZE, MAX_IMPORT_POSTS
+
+def read_batches(path, batch_size):
+    """Yield (first line number, list of post objects) from an NDJSON file"""
+    batch = []
+    first_line = 1
+    with (sys.stdin if path == '-' else open(path, encoding='utf-8')) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            if not batch:
+                first_line = line_number
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield first_line, batch
+                batch = []
+    if batch:
+        yield first_line, batch
+
+def run_import(path, user_id, batch_size, chunk_size):
+    with app.app_context():
+        db.create_all()
+        if not User.query.get(user_id):
+            raise ValueError(f"User {user_id} not found")
+
+        started = time.perf_counter()
+        total = 0
+        for first_line, batch in read_batches(path, batch_size):
+            try:
+                result = import_posts(user_id, batch, chunk_size)
+            except PostImportError as e:
+                for error in e.errors[:10]:
+                    print(f"❌ Line {first_line + error['index']}: {error['error']}")
+                raise ValueError(f"Batch starting at line {first_line} rejected ({len(e.errors)} invalid posts)")
+            total += result['created']
+            print(f"📥 {total} posts imported ({result['posts_per_second']} posts/s in this batch)")
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f"✅ Imported {total} posts in {elapsed:.1f}s ({rate:.0f} posts/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import posts from NDJSON")
+    parser.add_argument('path', help="NDJSON file to import ('-' for stdin)")
+    parser.add_argument('--user-id', type=int, required=True, help="Author of the imported posts")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help=f"Posts per transaction (max {MAX_IMPORT_POSTS})")
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="Rows per multi-row INSERT")
+    args = parser.parse_args()
+
+    try:
+        run_import(args.path, args.user_id, min(args.batch_size, MAX_IMPORT_POSTS), args.chunk_size)
+    except Exception as e:
+        print(f"❌ Error importing posts: {e}")
+        sys.exit(1)
@@ -30,6 +30,12 @@ CORS(app,
 from models.user import User, db
 from models.profile import Profile, Skill, Experience, Education
 from models.post import Post
+from models.search import SearchTerm, SearchPosting, SearchIndexStats
+from models.tag import PostTag, TagCount
+from models.stats import PostCounter, PostDailyCount
+from models.like import PostLike, PostLikeShard
+from models.views import PostDailyViewSketch, PostViewSketch
+from models.follow import Follow, FollowCount
 
 # Initialize database
 db.init_app(app)
@@ -57,6 +63,30 @@ def serve_uploaded_image(filename):
     """Serve uploaded images from the root level"""
     return send_from_directory(Config.UPLOAD_FOLDER, filename)
 
+# Compress large responses (gzip/brotli via Accept-Encoding)
+from utils.compression import init_compression
+init_compression(app)
+
+# Cache metrics (L1 hit/miss/eviction counts per key prefix)
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from utils.cache import cache_stats
+
+@app.route('/api/metrics/cache')
+@jwt_required()
+def get_cache_metrics():
+    """Expose cache statistics for monitoring"""
+    return jsonify(cache_stats())
+
+# Feed delivery metrics (fan-out writes, skipped high-follower authors, read-time merges)
+from utils.timeline import timeline_metrics
+
+@app.route('/api/metrics/feed')
+@jwt_required()
+def get_feed_metrics():
+    """Expose feed fan-out and merge statistics for monitoring"""
+    return jsonify(timeline_metrics())
+
 def setup_database():
     """Setup database tables"""
     with app.app_context():
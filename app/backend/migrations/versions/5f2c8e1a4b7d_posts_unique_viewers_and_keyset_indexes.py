@@ -0,0 +1,57 @@
+"""Add posts.unique_viewers and the keyset pagination indexes
+
+Revision ID: 5f2c8e1a4b7d
+Revises: d3260baced7a
+Create Date: 2026-10-18 09:00:00.000000
+
+db.create_all() never alters an existing posts table, so databases created
+before these model changes need this revision. Databases created since
+already have them, hence the existence checks.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2c8e1a4b7d'
+down_revision = 'd3260baced7a'
+branch_labels = None
+depends_on = None
+
+SORTABLE_FIELDS = ['created_at', 'updated_at', 'likes_count', 'views_count', 'comments_count', 'shares_count']
+
+
+def _index_name(field):
+    return f'ix_posts_published_{field}_id'
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('posts'):
+        # Created in full by db.create_all()
+        return
+
+    columns = {column['name'] for column in inspector.get_columns('posts')}
+    if 'unique_viewers' not in columns:
+        op.add_column('posts', sa.Column('unique_viewers', sa.Integer(), nullable=True, server_default='0'))
+
+    indexes = {index['name'] for index in inspector.get_indexes('posts')}
+    for field in SORTABLE_FIELDS:
+        if _index_name(field) not in indexes:
+            op.create_index(_index_name(field), 'posts', ['is_published', field, 'id'])
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('posts'):
+        return
+
+    indexes = {index['name'] for index in inspector.get_indexes('posts')}
+    for field in SORTABLE_FIELDS:
+        if _index_name(field) in indexes:
+            op.drop_index(_index_name(field), table_name='posts')
+
+    columns = {column['name'] for column in inspector.get_columns('posts')}
+    if 'unique_viewers' in columns:
+        with op.batch_alter_table('posts') as batch_op:
+            batch_op.drop_column('unique_viewers')
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from datetime import datetime
+from models.user import db
+
+
+class Follow(db.Model):
+    """follower_id follows followee_id; the primary key makes following idempotent"""
+    __tablename__ = 'follows'
+
+    follower_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    followee_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Fan-out reads an author's followers
+        Index('ix_follows_followee_id', 'followee_id', 'follower_id'),
+    )
+
+    def __repr__(self):
+        return f'<Follow {self.follower_id} -> {self.followee_id}>'
+
+
+class FollowCount(db.Model):
+    """Follower count per user, maintained by follow/unfollow; decides push vs pull delivery"""
+    __tablename__ = 'follow_counts'
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    followers = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<FollowCount user={self.user_id} followers={self.followers}>'
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from datetime import datetime
+from models.user import db
+
+
+class PostLike(db.Model):
+    """One row per (user, post) like; the primary key makes liking idempotent"""
+    __tablename__ = 'post_likes'
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_post_likes_post_id', 'post_id'),
+    )
+
+    def __repr__(self):
+        return f'<PostLike user={self.user_id} post={self.post_id}>'
+
+
+class PostLikeShard(db.Model):
+    """Pending like-count deltas for hot posts, spread over several rows
+
+    Writers pick a random shard so concurrent likes on one post do not queue
+    on a single row lock. Readers add the shard sum to posts.likes_count, and
+    a periodic fold moves the deltas into posts.likes_count.
+    """
+    __tablename__ = 'post_like_shards'
+
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    delta = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PostLikeShard post={self.post_id} shard={self.shard} delta={self.delta}>'
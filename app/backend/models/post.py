@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from models.user import db
@@ -24,6 +24,7 @@ class Post(db.Model):
     comments_count = Column(Integer, default=0)
     shares_count = Column(Integer, default=0)
     views_count = Column(Integer, default=0)
+    unique_viewers = Column(Integer, default=0)  # HyperLogLog estimate, refreshed by the view flusher
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -32,6 +33,13 @@ class Post(db.Model):
     # Relationships
     user = relationship('User', back_populates='posts')
     
+    # Keyset pagination indexes: one (is_published, sort column, id) index per sortable field
+    SORTABLE_FIELDS = ['created_at', 'updated_at', 'likes_count', 'views_count', 'comments_count', 'shares_count']
+    __table_args__ = tuple(
+        Index(f'ix_posts_published_{field}_id', 'is_published', field, 'id')
+        for field in SORTABLE_FIELDS
+    )
+    
     def __repr__(self):
         return f'<Post {self.id} by {self.user_id}>'
     
@@ -52,6 +60,7 @@ class Post(db.Model):
             'comments_count': self.comments_count,
             'shares_count': self.shares_count,
             'views_count': self.views_count,
+            'unique_viewers': self.unique_viewers or 0,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'user': {
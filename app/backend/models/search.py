@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Index
+from models.user import db
+
+
+class SearchTerm(db.Model):
+    """Dictionary entry of the post search index: one row per distinct term"""
+    __tablename__ = 'post_search_terms'
+
+    term = Column(String(64), primary_key=True)
+    doc_freq = Column(Integer, nullable=False, default=0)  # Number of posts containing the term
+
+    def __repr__(self):
+        return f'<SearchTerm {self.term} df={self.doc_freq}>'
+
+
+class SearchPosting(db.Model):
+    """Postings list entry: term occurs in post with the given frequency"""
+    __tablename__ = 'post_search_postings'
+
+    term = Column(String(64), primary_key=True)
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    term_freq = Column(Integer, nullable=False)
+    doc_length = Column(Integer, nullable=False)  # Denormalized so scoring never joins posts
+
+    __table_args__ = (
+        Index('ix_post_search_postings_post_id', 'post_id'),
+    )
+
+    def __repr__(self):
+        return f'<SearchPosting {self.term} -> {self.post_id}>'
+
+
+class SearchIndexStats(db.Model):
+    """Corpus-wide statistics needed for BM25 (single row)"""
+    __tablename__ = 'post_search_stats'
+
+    id = Column(Integer, primary_key=True)
+    doc_count = Column(Integer, nullable=False, default=0)
+    total_length = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Date
+from models.user import db
+
+
+class PostCounter(db.Model):
+    """Named site-wide post totals, updated transactionally by post writes"""
+    __tablename__ = 'post_counters'
+
+    name = Column(String(50), primary_key=True)  # 'total_posts', 'featured_posts', 'total_likes', 'total_views'
+    value = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PostCounter {self.name}={self.value}>'
+
+
+class PostDailyCount(db.Model):
+    """Published posts bucketed by creation day, summed for rolling windows"""
+    __tablename__ = 'post_daily_counts'
+
+    day = Column(Date, primary_key=True)
+    posts = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PostDailyCount {self.day}={self.posts}>'
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from models.user import db
+
+
+class PostTag(db.Model):
+    """Normalized post <-> tag association mirroring the Post.tags JSON column"""
+    __tablename__ = 'post_tags'
+
+    # Primary key leads with post_id, so it doubles as the per-post index
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String(100), primary_key=True)  # Normalized (trimmed, lowercase) tag
+    created_at = Column(DateTime, nullable=False)  # Copied from the post for (tag, created_at) scans
+
+    __table_args__ = (
+        Index('ix_post_tags_tag_created_at', 'tag', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<PostTag {self.tag} -> {self.post_id}>'
+
+
+class TagCount(db.Model):
+    """Number of published posts per tag, maintained incrementally by post writes"""
+    __tablename__ = 'tag_counts'
+
+    tag = Column(String(100), primary_key=True)  # Normalized tag
+    name = Column(String(100), nullable=False)  # Display form, as first seen
+    post_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_tag_counts_post_count', 'post_count'),
+    )
+
+    def __repr__(self):
+        return f'<TagCount {self.tag}={self.post_count}>'
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Date, LargeBinary, ForeignKey
+from models.user import db
+
+
+class PostDailyViewSketch(db.Model):
+    """HyperLogLog registers of the viewers a post had on one day"""
+    __tablename__ = 'post_daily_view_sketches'
+
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<PostDailyViewSketch post={self.post_id} day={self.day}>'
+
+
+class PostViewSketch(db.Model):
+    """All-time HyperLogLog of a post's viewers (the merge of every daily sketch)"""
+    __tablename__ = 'post_view_sketches'
+
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<PostViewSketch post={self.post_id}>'
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Search Index Rebuild Script
+Re-tokenizes every post and rebuilds the inverted index used by post search.
+Run this once after deploying search, or whenever the index looks out of sync.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from utils.search_index import rebuild_index
+
+def rebuild_search_index():
+    """Rebuild the post search index from the posts table"""
+    with app.app_context():
+        print("🔄 Rebuilding post search index...")
+        db.create_all()
+        count = rebuild_index()
+        print(f"✅ Indexed {count} posts")
+
+if __name__ == "__main__":
+    try:
+        rebuild_search_index()
+    except Exception as e:
+        print(f"❌ Error rebuilding search index: {e}")
+        sys.exit(1)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Post Stats Reconciliation Script
+Recomputes the materialized post counters behind /api/posts/stats from the
+posts table and corrects any drift. Run once, or with --interval to keep
+running as a periodic job.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from utils.post_stats import reconcile_post_stats
+
+def reconcile():
+    """Reconcile counters once and report drift"""
+    with app.app_context():
+        drift = reconcile_post_stats()
+        if drift:
+            print(f"⚠️  Corrected drift: {drift}")
+        else:
+            print("✅ Post counters are in sync")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile post stats counters")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Repeat every N seconds (default: run once)")
+    args = parser.parse_args()
+
+    try:
+        with app.app_context():
+            db.create_all()
+        reconcile()
+        while args.interval > 0:
+            time.sleep(args.interval)
+            reconcile()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"❌ Error reconciling post stats: {e}")
+        sys.exit(1)
@@ -0,0 +1,394 @@
+import logging
+import json
+import redis
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until it has had time to recover
+
+    closed    - calls go through; consecutive failures are counted
+    open      - calls are skipped until reset_timeout has passed
+    half_open - a single probe decides whether to close or re-open
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire_probe(self):
+        """True if the caller should run the half-open probe now"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def allow(self):
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Cache circuit breaker closed, Redis is reachable again")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                if self.state == self.CLOSED:
+                    self.trips += 1
+                    logger.warning("Cache circuit breaker opened after %d consecutive Redis failures", self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def metrics(self):
+        return {
+            'state': self.state,
+            'state_value': self.STATE_VALUES[self.state],
+            'consecutive_failures': self.failures,
+            'trips': self.trips
+        }
+
+class CacheClient:
+    """Redis client with a bounded connection pool, short timeouts and a circuit breaker
+
+    Every operation goes through run(); while the breaker is open nothing
+    touches the network and the caller gets its fallback value immediately.
+    """
+
+    def __init__(self, url):
+        self.pool = redis.ConnectionPool.from_url(
+            url,
+            max_connections=Config.CACHE_REDIS_MAX_CONNECTIONS,
+            socket_timeout=Config.CACHE_REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=Config.CACHE_REDIS_SOCKET_TIMEOUT,
+            health_check_interval=30
+        )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        self.breaker = CircuitBreaker(
+            Config.CACHE_BREAKER_FAILURE_THRESHOLD,
+            Config.CACHE_BREAKER_RESET_TIMEOUT
+        )
+
+    @property
+    def available(self):
+        """Whether Redis calls are currently allowed (runs a due half-open probe)"""
+        if self.breaker.acquire_probe():
+            try:
+                self.redis.ping()
+                self.breaker.record_success()
+            except redis.RedisError:
+                self.breaker.record_failure()
+        return self.breaker.allow()
+
+    def run(self, operation, default=None):
+        """Run operation(redis) unless the breaker is open; return default on failure"""
+        if not self.available:
+            return default
+        try:
+            result = operation(self.redis)
+        except redis.RedisError as e:
+            logger.debug("Redis call failed: %s", e)
+            self.breaker.record_failure()
+            return default
+        self.breaker.record_success()
+        return result
+
+    def metrics(self):
+        return {
+            'breaker': self.breaker.metrics(),
+            'pool': {
+                'max_connections': self.pool.max_connections,
+                'in_use': len(self.pool._in_use_connections),
+                'idle': len(self.pool._available_connections)
+            }
+        }
+
+cache_client = CacheClient(Config.REDIS_URL)
+
+# Generation counters live under this prefix, one key per invalidation scope
+GENERATION_PREFIX = 'gen:'
+
+def key_prefix(key):
+    """Bucket used for per-prefix statistics, e.g. 'posts:list' or 'gen:tag'"""
+    return ':'.join(key.split(':')[:2])
+
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL
+
+    Sits in front of Redis so hot keys are served without a network round
+    trip or decoding. Entries are evicted least-recently-used when the cache
+    is full and lazily when their TTL has passed.
+    """
+
+    def __init__(self, max_entries, default_ttl):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, key, event):
+        prefix_stats = self._stats.setdefault(key_prefix(key), {
+            'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'evictions': 0
+        })
+        prefix_stats[event] += 1
+
+    def record(self, key, event):
+        """Count an event that happened outside the L1 (L2 hit or full miss)"""
+        with self._lock:
+            self._count(key, event)
+
+    def get(self, key):
+        """Return (found, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._count(key, 'evictions')
+                return False, None
+            self._entries.move_to_end(key)
+            self._count(key, 'l1_hits')
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        ttl = min(ttl or self.default_ttl, self.default_ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._count(evicted_key, 'evictions')
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'prefixes': {prefix: dict(counts) for prefix, counts in self._stats.items()}
+            }
+
+local_cache = LocalCache(Config.CACHE_L1_MAX_ENTRIES, Config.CACHE_L1_TTL)
+
+# Cross-worker invalidation: every worker subscribes and drops the announced keys from its L1
+_listener_started = False
+_listener_lock = threading.Lock()
+
+def _listen_for_invalidations():
+    # Dedicated connection without a read timeout: listen() blocks between messages
+    subscriber = redis.Redis.from_url(
+        Config.REDIS_URL,
+        socket_connect_timeout=Config.CACHE_REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True
+    )
+    while True:
+        if not cache_client.available:
+            time.sleep(1)
+            continue
+        try:
+            pubsub = subscriber.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(Config.CACHE_INVALIDATION_CHANNEL)
+            # Anything published while we were disconnected is lost, so start clean
+            local_cache.clear()
+            for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                keys = message['data'].decode('utf-8').split('\n')
+                local_cache.delete(*keys)
+        except redis.RedisError:
+            cache_client.breaker.record_failure()
+            time.sleep(1)
+
+def ensure_invalidation_listener():
+    """Start the background subscriber once per process"""
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        thread = threading.Thread(target=_listen_for_invalidations, name='cache-invalidation', daemon=True)
+        thread.start()
+        _listener_started = True
+
+def publish_invalidation(keys):
+    """Drop keys from this worker's L1 and tell the other workers to do the same"""
+    if not keys:
+        return
+    local_cache.delete(*keys)
+    cache_client.run(lambda r: r.publish(Config.CACHE_INVALIDATION_CHANNEL, '\n'.join(keys)))
+
+def get_cache_key(prefix, **kwargs):
+    """Generate cache key for Redis"""
+    key_parts = [prefix]
+    for k, v in sorted(kwargs.items()):
+        key_parts.append(f"{k}:{v}")
+    return ":".join(key_parts)
+
+def get_cached_data(key, expire_time=300):
+    """Get data from cache, checking the in-process L1 before Redis"""
+    found, value = local_cache.get(key)
+    if found:
+        return value
+
+    ensure_invalidation_listener()
+    data = cache_client.run(lambda r: r.get(key))
+    if data:
+        value = json.loads(data)
+        local_cache.record(key, 'l2_hits')
+        local_cache.set(key, value, expire_time)
+        return value
+    local_cache.record(key, 'misses')
+    return None
+
+def set_cached_data(key, data, expire_time=300):
+    """Set data in both cache tiers"""
+    local_cache.set(key, data, expire_time)
+    payload = json.dumps(data, separators=(',', ':'))
+    cache_client.run(lambda r: r.setex(key, expire_time, payload))
+
+def get_cached_many(keys, expire_time=300):
+    """Look up several keys at once: L1 first, then a single MGET for the rest
+
+    Returns {key: value} for the keys that were found.
+    """
+    found = {}
+    missing = []
+    for key in keys:
+        hit, value = local_cache.get(key)
+        if hit:
+            found[key] = value
+        else:
+            missing.append(key)
+
+    if missing:
+        ensure_invalidation_listener()
+        values = cache_client.run(lambda r: r.mget(missing)) or [None] * len(missing)
+        for key, data in zip(missing, values):
+            if data:
+                found[key] = json.loads(data)
+                local_cache.record(key, 'l2_hits')
+                local_cache.set(key, found[key], expire_time)
+            else:
+                local_cache.record(key, 'misses')
+    return found
+
+def set_cached_many(items, expire_time=300):
+    """Store several {key: value} pairs in both tiers with one pipelined round trip"""
+    if not items:
+        return
+    for key, value in items.items():
+        local_cache.set(key, value, expire_time)
+
+    def set_all(r):
+        pipe = r.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, expire_time, json.dumps(value, separators=(',', ':')))
+        return pipe.execute()
+
+    cache_client.run(set_all)
+
+def delete_cached_data(*keys):
+    """Remove keys from Redis and from every worker's L1"""
+    if not keys:
+        return
+    cache_client.run(lambda r: r.delete(*keys))
+    publish_invalidation(list(keys))
+
+def get_generations(scopes):
+    """Current generation number of each scope (0 if never bumped)
+
+    Generations are held in L1 too; bump_generations() announces changes so
+    other workers drop their copies.
+    """
+    keys = [GENERATION_PREFIX + scope for scope in scopes]
+    generations = {}
+    missing = []
+    for key in keys:
+        found, value = local_cache.get(key)
+        if found:
+            generations[key] = value
+        else:
+            missing.append(key)
+
+    if missing:
+        ensure_invalidation_listener()
+        values = cache_client.run(lambda r: r.mget(missing))
+        if values is not None:
+            for key, value in zip(missing, values):
+                local_cache.record(key, 'l2_hits' if value else 'misses')
+                generations[key] = int(value) if value else 0
+                local_cache.set(key, generations[key])
+
+    return [generations.get(key, 0) for key in keys]
+
+def bump_generations(scopes):
+    """Invalidate every cache entry built under the given scopes
+
+    Each scope is a single INCR, so the cost is independent of how many keys
+    are cached. Entries keyed on an old generation are never read again and
+    simply age out through their TTL.
+    """
+    if not scopes:
+        return
+
+    keys = [GENERATION_PREFIX + scope for scope in set(scopes)]
+
+    # Bump this worker's copy first so its own L1 entries go stale even if Redis is unreachable
+    for key in keys:
+        found, value = local_cache.get(key)
+        local_cache.set(key, (value if found else 0) + 1)
+
+    def incr_all(r):
+        pipe = r.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+        return pipe.execute()
+
+    if cache_client.run(incr_all) is not None:
+        publish_invalidation(keys)
+
+def get_scoped_cache_key(prefix, scopes, **kwargs):
+    """Cache key that embeds the generations of the scopes it depends on"""
+    generations = get_generations(scopes)
+    version = '.'.join(f"{scope}={generation}" for scope, generation in zip(scopes, generations))
+    return get_cache_key(prefix, v=version, **kwargs)
+
+def cache_stats():
+    """Hit, miss and eviction counts per key prefix"""
+    return {
+        'redis': cache_client.metrics(),
+        'l1': local_cache.stats()
+    }
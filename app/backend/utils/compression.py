@@ -0,0 +1,78 @@
+import gzip
+from flask import request
+from config import Config
+
+# Brotli is optional; without it only gzip is negotiated
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def compress_gzip(body):
+    return gzip.compress(body, compresslevel=Config.COMPRESSION_GZIP_LEVEL)
+
+def compress_brotli(body):
+    if brotli is None:
+        return None
+    return brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY)
+
+def supported_encodings():
+    """Encodings this process can produce, best first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate_encoding(available):
+    """Best of the available encodings the client accepts, or None for identity"""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+def encoded_etag(etag, encoding):
+    """Validator for the `encoding` variant of a representation tagged etag
+
+    A strong ETag must differ between content-codings, so compressed
+    variants carry the coding as a suffix; identity keeps the plain tag.
+    """
+    return f"{etag}-{encoding}" if encoding else etag
+
+def _should_compress(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    # Cached responses arrive with their precompressed variant already selected
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in Config.COMPRESSION_MIMETYPES:
+        return False
+    return response.content_length is None or response.content_length >= Config.COMPRESSION_MIN_SIZE
+
+def compress_response(response):
+    """after_request hook: gzip or brotli-encode large text responses the client can decode"""
+    if not _should_compress(response):
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    # The representation now depends on Accept-Encoding, whether or not we compress this one
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(supported_encodings())
+    if encoding is None:
+        return response
+
+    compressed = compress_brotli(body) if encoding == 'br' else compress_gzip(body)
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+def init_compression(app):
+    """Compress responses of app according to the COMPRESSION_* settings"""
+    app.after_request(compress_response)
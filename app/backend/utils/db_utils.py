@@ -0,0 +1,124 @@
+import logging
+from models.user import db
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_increment(model, rows, key_fields, count_fields):
+    """Add deltas to counter columns, inserting rows that do not exist yet
+
+    `rows` is a list of dicts holding the key columns, the count deltas and
+    optionally insert-only columns. The statement runs inside the current
+    session transaction, so counters commit or roll back with the write that
+    caused them. Uses the dialect's native upsert so concurrent writers never
+    lose an increment.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = db.engine.dialect.name
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update({
+            field: table.c[field] + stmt.inserted[field] for field in count_fields
+        })
+        db.session.execute(stmt, rows)
+    elif dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_fields,
+            set_={field: table.c[field] + stmt.excluded[field] for field in count_fields}
+        )
+        db.session.execute(stmt, rows)
+    else:
+        # Generic fallback: update in place, insert whatever was missing
+        for row in rows:
+            condition = [table.c[field] == row[field] for field in key_fields]
+            result = db.session.execute(
+                table.update().where(*condition).values({
+                    field: table.c[field] + row[field] for field in count_fields
+                })
+            )
+            if result.rowcount == 0:
+                db.session.execute(table.insert().values(row))
+
+
+_consecutive_autoinc = None
+
+
+def _mysql_autoinc_is_consecutive():
+    """Whether a multi-row INSERT gets consecutive ids (innodb_autoinc_lock_mode 0 or 1)"""
+    global _consecutive_autoinc
+    if _consecutive_autoinc is None:
+        from sqlalchemy import text
+        mode = db.session.execute(text('SELECT @@innodb_autoinc_lock_mode')).scalar()
+        _consecutive_autoinc = mode is not None and int(mode) in (0, 1)
+        logger.info("innodb_autoinc_lock_mode is %s, multi-row INSERT ids are %s", mode,
+                    'consecutive' if _consecutive_autoinc else 'recovered by re-selecting the rows')
+    return _consecutive_autoinc
+
+
+def _reselect_ids(table, rows, first_id, match_columns):
+    """Ids of just-inserted rows, found by id >= first_id and their match_columns values
+
+    A statement's rows get increasing ids in row order, so the inserted rows
+    are matched, in id order, as the earliest subsequence with their keys.
+    """
+    from sqlalchemy import select, tuple_
+
+    keys = [tuple(row[column] for column in match_columns) for row in rows]
+    columns = [table.c[column] for column in match_columns]
+    found = db.session.execute(
+        select(table.c.id, *columns)
+        .where(table.c.id >= first_id, tuple_(*columns).in_(set(keys)))
+        .order_by(table.c.id)
+    ).all()
+
+    ids = []
+    for found_id, *key in found:
+        if len(ids) < len(keys) and tuple(key) == keys[len(ids)]:
+            ids.append(found_id)
+    if len(ids) != len(keys):
+        raise RuntimeError(f"Found {len(ids)} of {len(keys)} inserted {table.name} rows")
+    return ids
+
+
+def insert_returning_ids(table, rows, match_columns=None):
+    """Insert rows with multi-row INSERT statements and return their new ids in row order
+
+    Uses INSERT ... RETURNING batches where the dialect supports it. On
+    MySQL a single multi-row INSERT is issued and the ids are derived from
+    LAST_INSERT_ID() when InnoDB allocates them consecutively
+    (innodb_autoinc_lock_mode 0 or 1). Under lock mode 2, the MySQL 8
+    default, they are re-selected in the same transaction by the
+    `match_columns` values; without match_columns rows are inserted one
+    statement at a time.
+    """
+    if not rows:
+        return []
+
+    dialect = db.engine.dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            table.insert().returning(table.c.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+
+    if dialect.name == 'mysql':
+        consecutive = _mysql_autoinc_is_consecutive()
+        if consecutive or match_columns:
+            result = db.session.execute(table.insert().values(rows))
+            first_id = result.lastrowid
+            if consecutive:
+                return list(range(first_id, first_id + len(rows)))
+            return _reselect_ids(table, rows, first_id, match_columns)
+
+    logger.debug("Inserting %d %s rows one statement at a time", len(rows), table.name)
+    return [db.session.execute(table.insert().values(row)).inserted_primary_key[0] for row in rows]
@@ -0,0 +1,188 @@
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+import numpy as np
+from config import Config
+
+# Ranking features: name -> fn(candidates, context) returning one float per candidate
+_features = {}
+
+def register_feature(name):
+    """Decorator adding a ranking feature that weights can refer to by name"""
+    def decorator(fn):
+        _features[name] = fn
+        return fn
+    return decorator
+
+def feature_names():
+    return list(_features)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def epoch_seconds(value):
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (value - _EPOCH).total_seconds()
+
+
+class CandidateBatch:
+    """Candidate posts held as parallel NumPy columns, so features are computed per batch
+
+    `created_at` is float64 epoch seconds (NaN if unknown). Tags are flattened into integer codes (`tag_codes`) with the candidate
+    row each belongs to (`tag_rows`) and the distinct tag strings in
+    `vocabulary`, so per-tag lookups run once per distinct tag.
+    """
+
+    def __init__(self, post_ids, author_ids, created_at, likes, comments, shares, tags):
+        self.post_ids = np.asarray(post_ids, dtype=np.int64)
+        self.author_ids = np.asarray(author_ids, dtype=np.int64)
+        self.created_at = np.asarray(created_at, dtype=np.float64)
+        self.likes = np.asarray(likes, dtype=np.float64)
+        self.comments = np.asarray(comments, dtype=np.float64)
+        self.shares = np.asarray(shares, dtype=np.float64)
+
+        tags = [post_tags or () for post_tags in tags]
+        codes = {}
+        self.tag_codes = np.fromiter(
+            (codes.setdefault(tag, len(codes)) for tag in chain.from_iterable(tags)), dtype=np.int64
+        )
+        self.tag_rows = np.repeat(np.arange(len(tags)), np.fromiter(map(len, tags), dtype=np.int64, count=len(tags)))
+        self.vocabulary = list(codes)
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from a list of (id, user_id, created_at, likes, comments, shares, tags) rows
+
+        Each column is read straight into its array; created_at datetimes
+        (naive UTC) become epoch seconds.
+        """
+        count = len(rows)
+
+        def column(values, dtype):
+            return np.fromiter(values, dtype=dtype, count=count)
+
+        return cls(
+            column((row[0] for row in rows), np.int64),
+            column((row[1] for row in rows), np.int64),
+            column((np.nan if row[2] is None else epoch_seconds(row[2]) for row in rows), np.float64),
+            column((row[3] or 0 for row in rows), np.float64),
+            column((row[4] or 0 for row in rows), np.float64),
+            column((row[5] or 0 for row in rows), np.float64),
+            [row[6] for row in rows],
+        )
+
+
+def ranking_context(now=None, author_affinity=None, tag_interest=None, half_life=None):
+    """Per-request inputs shared by the features"""
+    return {
+        'now': epoch_seconds(now or datetime.utcnow()),
+        'author_affinity': author_affinity or {},
+        'tag_interest': tag_interest or {},
+        'half_life': half_life or Config.FEED_RANKING_HALF_LIFE,
+    }
+
+def _lookup(keys, mapping, default=0.0):
+    """Vectorized mapping.get(key, default) over an int64 array"""
+    if not mapping:
+        return np.full(len(keys), default)
+    known = np.fromiter(mapping.keys(), dtype=np.int64, count=len(mapping))
+    values = np.fromiter(mapping.values(), dtype=np.float64, count=len(mapping))
+    order = np.argsort(known)
+    known, values = known[order], values[order]
+    positions = np.minimum(np.searchsorted(known, keys), len(known) - 1)
+    return np.where(known[positions] == keys, values[positions], default)
+
+@register_feature('recency')
+def recency(candidates, context):
+    """1.0 for a post created now, halving every half_life seconds; 0 if unknown"""
+    age = np.maximum(context['now'] - candidates.created_at, 0)
+    return np.exp2(-np.nan_to_num(age, nan=np.inf) / context['half_life'])
+
+@register_feature('likes')
+def likes(candidates, context):
+    return np.log1p(candidates.likes)
+
+@register_feature('comments')
+def comments(candidates, context):
+    return np.log1p(candidates.comments)
+
+@register_feature('shares')
+def shares(candidates, context):
+    return np.log1p(candidates.shares)
+
+@register_feature('affinity')
+def affinity(candidates, context):
+    """log(1 + the viewer's interactions with the post's author)"""
+    return np.log1p(_lookup(candidates.author_ids, context['author_affinity']))
+
+@register_feature('tag_overlap')
+def tag_overlap(candidates, context):
+    """Sum of the viewer's interest in each of the post's tags, log-damped"""
+    interest = context['tag_interest']
+    if not interest or not len(candidates.tag_codes):
+        return np.zeros(len(candidates))
+    per_tag = np.array([interest.get(tag, 0.0) for tag in candidates.vocabulary], dtype=np.float64)
+    totals = np.bincount(candidates.tag_rows, weights=per_tag[candidates.tag_codes], minlength=len(candidates))
+    return np.log1p(totals)
+
+def score(candidates, weights=None, context=None):
+    """Weighted sum of the ranking features for every candidate at once
+
+    `weights` maps feature names to weights (default FEED_RANKING_WEIGHTS);
+    features with a zero weight are not computed.
+    """
+    weights = Config.FEED_RANKING_WEIGHTS if weights is None else weights
+    context = context or ranking_context()
+    unknown = set(weights) - set(_features)
+    if unknown:
+        raise ValueError(f"Unknown ranking features: {', '.join(sorted(unknown))}")
+
+    scores = np.zeros(len(candidates))
+    for name, weight in weights.items():
+        if weight:
+            scores += weight * _features[name](candidates, context)
+    return scores
+
+def rank(candidates, weights=None, context=None):
+    """Post ids ordered by score, highest first (ties keep the newer post first)"""
+    if not len(candidates):
+        return []
+    scores = score(candidates, weights, context)
+    # lexsort sorts by its last key first: score descending, then post id descending
+    order = np.lexsort((-candidates.post_ids, -scores))
+    return candidates.post_ids[order].tolist()
+
+def viewer_signals(user_id, limit=None):
+    """(author affinity, tag interest) from the viewer's most recent likes"""
+    from models.user import db
+    from models.post import Post
+    from models.like import PostLike
+
+    rows = (
+        db.session.query(Post.user_id, Post.tags)
+        .join(PostLike, PostLike.post_id == Post.id)
+        .filter(PostLike.user_id == user_id)
+        .order_by(PostLike.created_at.desc())
+        .limit(limit or Config.FEED_RANKING_SIGNAL_LIKES)
+        .all()
+    )
+    author_affinity = Counter(author_id for author_id, _ in rows)
+    tag_interest = Counter(tag for _, tags in rows for tag in (tags or ()))
+    return author_affinity, tag_interest
+
+def load_candidates(post_ids):
+    """Feature columns for the published posts among post_ids, in one query"""
+    from models.user import db
+    from models.post import Post
+
+    if not post_ids:
+        return CandidateBatch.from_rows([])
+    rows = (
+        db.session.query(Post.id, Post.user_id, Post.created_at, Post.likes_count,
+                         Post.comments_count, Post.shares_count, Post.tags)
+        .filter(Post.id.in_(post_ids), Post.is_published == True)
+        .all()
+    )
+    return CandidateBatch.from_rows(rows)
@@ -0,0 +1,22 @@
+class InvalidFieldsError(ValueError):
+    """Raised when a fields= parameter names a field the endpoint does not have"""
+
+
+def parse_fields(raw, allowed, always=('id',)):
+    """Parse a comma-separated fields= parameter into a tuple in `allowed` order
+
+    Returns None when the parameter is absent or empty (meaning every field).
+    Fields in `always` are added to any selection so responses stay keyed.
+    Ordering is canonical, so equivalent requests share a cache key.
+    """
+    if not raw or not raw.strip():
+        return None
+
+    requested = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    requested.update(always)
+    return tuple(field for field in allowed if field in requested)
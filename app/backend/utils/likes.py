@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models.user import db
+from models.like import PostLike, PostLikeShard
+from utils.cache import bump_generations
+from utils.db_utils import upsert_increment
+from utils.post_cache import post_counter_scopes
+from utils.view_counter import ensure_flusher, register_flush_task
+
+# Per-process like rate per post for the current minute: post_id -> (minute, likes)
+_like_rate = {}
+_like_rate_lock = threading.Lock()
+
+def _is_hot(post_id):
+    """Count a like and report whether the post is above the hot threshold"""
+    minute = int(time.time() // 60)
+    with _like_rate_lock:
+        seen_minute, likes = _like_rate.get(post_id, (minute, 0))
+        likes = likes + 1 if seen_minute == minute else 1
+        _like_rate[post_id] = (minute, likes)
+        if len(_like_rate) > 10000:
+            for stale_id in [pid for pid, (m, _) in _like_rate.items() if m != minute]:
+                del _like_rate[stale_id]
+    return likes > Config.HOT_POST_LIKES_PER_MINUTE
+
+def _apply_like_delta(post_id, delta):
+    """Atomically adjust a post's like count; returns True if it went to a shard row"""
+    from models.post import Post
+
+    if _is_hot(post_id):
+        ensure_flusher()
+        upsert_increment(
+            PostLikeShard,
+            [{'post_id': post_id, 'shard': random.randrange(Config.LIKE_COUNTER_SHARDS), 'delta': delta}],
+            ['post_id', 'shard'], ['delta']
+        )
+        return True
+
+    table = Post.__table__
+    db.session.execute(
+        update(table).where(table.c.id == post_id).values(likes_count=table.c.likes_count + delta)
+    )
+    return False
+
+def like(user_id, post_id):
+    """Record a like inside the current transaction
+
+    Returns (changed, sharded): changed is False when the user had already
+    liked the post, so repeating the request has no effect.
+    """
+    if db.session.get(PostLike, (user_id, post_id)):
+        return False, False
+    try:
+        with db.session.begin_nested():
+            db.session.add(PostLike(user_id=user_id, post_id=post_id))
+    except IntegrityError:
+        # A concurrent request from the same user won the race
+        return False, False
+    return True, _apply_like_delta(post_id, 1)
+
+def unlike(user_id, post_id):
+    """Remove a like inside the current transaction; returns (changed, sharded)"""
+    result = db.session.execute(
+        delete(PostLike).where(PostLike.user_id == user_id, PostLike.post_id == post_id)
+    )
+    if result.rowcount == 0:
+        return False, False
+    return True, _apply_like_delta(post_id, -1)
+
+def like_counts(post_ids):
+    """Current like counts: posts.likes_count plus any unfolded shard deltas"""
+    from models.post import Post
+
+    if not post_ids:
+        return {}
+    counts = dict(
+        db.session.query(Post.id, Post.likes_count).filter(Post.id.in_(post_ids)).all()
+    )
+    pending = db.session.query(PostLikeShard.post_id, func.sum(PostLikeShard.delta)).filter(
+        PostLikeShard.post_id.in_(post_ids)
+    ).group_by(PostLikeShard.post_id).all()
+    for post_id, delta in pending:
+        counts[post_id] = (counts.get(post_id) or 0) + int(delta or 0)
+    return {post_id: count or 0 for post_id, count in counts.items()}
+
+def liked_post_ids(user_id, post_ids):
+    """Which of post_ids the user has liked, in a single indexed query"""
+    if not post_ids:
+        return set()
+    return set(db.session.execute(
+        select(PostLike.post_id).where(PostLike.user_id == user_id, PostLike.post_id.in_(post_ids))
+    ).scalars())
+
+def fold_like_shards():
+    """Move shard deltas into posts.likes_count; returns the number of posts folded
+
+    Shards are decremented by exactly what was read, in the same
+    transaction, so likes landing during the fold are kept for the next one.
+    Sharded likes do not invalidate caches, so the folded posts' scopes are
+    bumped here: cached counts of hot posts lag by at most one fold interval.
+    """
+    from models.post import Post
+
+    rows = db.session.query(PostLikeShard.post_id, PostLikeShard.shard, PostLikeShard.delta).filter(
+        PostLikeShard.delta != 0
+    ).all()
+    if not rows:
+        return 0
+
+    totals = {}
+    shard_table = PostLikeShard.__table__
+    for post_id, shard, delta in rows:
+        totals[post_id] = totals.get(post_id, 0) + delta
+        db.session.execute(
+            update(shard_table)
+            .where(shard_table.c.post_id == post_id, shard_table.c.shard == shard)
+            .values(delta=shard_table.c.delta - delta)
+        )
+
+    post_table = Post.__table__
+    for post_id, delta in totals.items():
+        db.session.execute(
+            update(post_table).where(post_table.c.id == post_id)
+            .values(likes_count=post_table.c.likes_count + delta)
+        )
+    db.session.commit()
+
+    bump_generations(post_counter_scopes(totals))
+    return len(totals)
+
+register_flush_task(fold_like_shards)
+
+def remove_post_likes(post_id):
+    """Delete a post's likes and shard rows inside the current transaction"""
+    db.session.execute(delete(PostLike).where(PostLike.post_id == post_id))
+    db.session.execute(delete(PostLikeShard).where(PostLikeShard.post_id == post_id))
@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import or_, and_, desc, asc
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the query"""
+
+
+def _encode_value(value):
+    """Convert a sort value into something JSON can carry"""
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    """Reverse of _encode_value"""
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(sort_by, sort_order, sort_value, row_id):
+    """Build an opaque cursor pointing just past (sort_value, row_id)"""
+    payload = {
+        's': sort_by,
+        'o': sort_order,
+        'k': [_encode_value(sort_value), row_id]
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_by, sort_order):
+    """Decode a cursor and return (sort_value, row_id)
+
+    The cursor must have been issued for the same sort field and order,
+    otherwise the keyset position would be meaningless.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        sort_value, row_id = payload['k']
+        if payload['s'] != sort_by or payload['o'] != sort_order:
+            raise InvalidCursorError('Cursor does not match the requested sort order')
+        return _decode_value(sort_value), int(row_id)
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError('Invalid cursor')
+
+
+def apply_keyset(query, sort_column, id_column, sort_order, position=None):
+    """Order a query by (sort_column, id_column) and seek past position
+
+    With a matching composite index this is an index range scan, so the cost
+    of a page does not depend on how deep into the result set it is.
+    """
+    if position is not None:
+        sort_value, row_id = position
+        if sort_order == 'desc':
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            ))
+
+    if sort_order == 'desc':
+        return query.order_by(desc(sort_column), desc(id_column))
+    return query.order_by(asc(sort_column), asc(id_column))
@@ -0,0 +1,59 @@
+from models.post import Post
+from utils.cache import get_cache_key, get_generations, get_cached_many, set_cached_many
+from utils.post_projection import listing_query, compile_row_serializer, ALL_POST_FIELDS
+from utils.post_tags import normalize_tags
+
+ITEM_CACHE_TTL = 60
+
+
+def post_cache_scopes(post):
+    """Cache scopes whose entries can include this post in its current state"""
+    scopes = {'posts', f'post:{post.id}', f'author:{post.user_id}'}
+    scopes.update(f'tag:{tag}' for tag in normalize_tags(post.tags))
+    if post.is_featured:
+        scopes.add('featured')
+    return scopes
+
+
+def post_counter_scopes(post_ids):
+    """Cache scopes to bump when only counters (likes, views) of these posts change
+
+    Listings are left to their TTL, so a like does not invalidate every page.
+    """
+    return {f'post:{post_id}' for post_id in post_ids} | {'stats'}
+
+
+def missing_post_cache_key(post_id):
+    """Negative-cache key recording that a post ID is missing or unpublished"""
+    return get_cache_key('posts:missing', id=post_id)
+
+
+def get_posts_by_ids(post_ids, fields=ALL_POST_FIELDS):
+    """Serialized published posts for post_ids: {post_id: post}
+
+    Each post is cached under a key versioned by its own post:<id>
+    generation. Generations and posts are each read with one MGET (after
+    L1), every miss is filled by a single IN query, and the results are
+    written back in one pipeline. Missing or unpublished ids are left out.
+    """
+    generations = get_generations([f'post:{pid}' for pid in post_ids])
+    cache_keys = {
+        pid: get_cache_key('posts:item', v=f'post:{pid}={generation}', id=pid, fields=','.join(fields))
+        for pid, generation in zip(post_ids, generations)
+    }
+    cached = get_cached_many(list(cache_keys.values()), ITEM_CACHE_TTL)
+    posts_by_id = {pid: cached[key] for pid, key in cache_keys.items() if key in cached}
+
+    misses = [pid for pid in post_ids if pid not in posts_by_id]
+    if misses:
+        serialize = compile_row_serializer(fields)
+        rows = (
+            listing_query(fields)
+            .add_columns(Post.id)
+            .filter(Post.id.in_(misses), Post.is_published == True)
+            .all()
+        )
+        fetched = {row[-1]: serialize(row) for row in rows}
+        set_cached_many({cache_keys[pid]: post for pid, post in fetched.items()}, ITEM_CACHE_TTL)
+        posts_by_id.update(fetched)
+    return posts_by_id
@@ -0,0 +1,41 @@
+import json
+from models.post import Post
+from utils.post_projection import listing_query, compile_row_serializer, ALL_POST_FIELDS
+
+EXPORT_CHUNK_SIZE = 1000
+MAX_EXPORT_CHUNK_SIZE = 5000
+
+
+def iter_posts(after_id=0, fields=ALL_POST_FIELDS, user_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield published posts as dicts in id order, starting after after_id
+
+    The table is walked in keyset chunks (id > last id, ORDER BY id,
+    LIMIT chunk_size), each read through a server-side cursor, so memory
+    use does not grow with the number of posts and no chunk re-counts or
+    skips over earlier rows. Resuming is just passing the last id seen.
+    """
+    serialize = compile_row_serializer(fields)
+    last_id = after_id or 0
+    while True:
+        query = (
+            listing_query(fields)
+            .add_columns(Post.id)
+            .filter(Post.is_published == True, Post.id > last_id)
+        )
+        if user_id:
+            query = query.filter(Post.user_id == user_id)
+
+        rows = query.order_by(Post.id).limit(chunk_size).yield_per(min(chunk_size, 500))
+        count = 0
+        for row in rows:
+            count += 1
+            last_id = row[-1]
+            yield serialize(row)
+        if count < chunk_size:
+            return
+
+
+def iter_ndjson(posts):
+    """One compact JSON document per line"""
+    for post in posts:
+        yield json.dumps(post, separators=(',', ':'), ensure_ascii=False) + '\n'
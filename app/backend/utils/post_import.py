@@ -0,0 +1,146 @@
+import time
+from datetime import datetime
+from models.user import db
+from models.post import Post
+from utils.cache import bump_generations, delete_cached_data
+from utils.db_utils import insert_returning_ids
+from utils.post_cache import missing_post_cache_key
+from utils.post_stats import add_post_stats
+from utils.post_tags import normalize_tags, add_new_post_tags, add_tag_counts
+from utils.search_index import index_new_posts
+from utils.timeline import fan_out
+
+IMPORT_CHUNK_SIZE = 500  # Rows per multi-row INSERT
+MAX_IMPORT_POSTS = 5000  # Posts per import call (one transaction)
+# Identify inserted rows when MySQL ids have to be re-selected (not created_at: MySQL may round it)
+IMPORT_MATCH_COLUMNS = ('user_id', 'content')
+
+# String spellings accepted for is_published (e.g. from CSV-derived NDJSON)
+PUBLISHED_STRINGS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class PostImportError(ValueError):
+    """Raised when any post in a batch is invalid; nothing is written"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid post(s)")
+        self.errors = errors  # [{'index': i, 'error': message}]
+
+
+def _post_row(item, user_id, now):
+    """Validate one import item and turn it into a posts row, like create_post does"""
+    if not isinstance(item, dict):
+        raise ValueError("Each post must be an object")
+
+    content = item.get('content')
+    content = content.strip() if isinstance(content, str) else ''
+    is_valid, message = Post.validate_content(content)
+    if not is_valid:
+        raise ValueError(message)
+
+    title = item.get('title') or None
+    if title is not None:
+        title = str(title).strip() or None
+        if title and len(title) > 200:
+            raise ValueError("Title is too long (max 200 characters)")
+
+    tags = item.get('tags') or []
+    if not isinstance(tags, list):
+        tags = []
+
+    created_at = item.get('created_at') or now
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            raise ValueError("created_at must be an ISO 8601 timestamp")
+    elif not isinstance(created_at, datetime):
+        raise ValueError("created_at must be an ISO 8601 timestamp")
+
+    is_published = item.get('is_published', True)
+    if isinstance(is_published, str) and is_published.strip().lower() in PUBLISHED_STRINGS:
+        is_published = PUBLISHED_STRINGS[is_published.strip().lower()]
+    if not isinstance(is_published, bool):
+        raise ValueError("is_published must be true or false")
+
+    return {
+        'user_id': user_id,
+        'content': content,
+        'title': title,
+        'tags': [str(tag) for tag in tags],
+        'is_published': is_published,
+        'is_featured': False,
+        'likes_count': 0,
+        'comments_count': 0,
+        'shares_count': 0,
+        'views_count': 0,
+        'unique_viewers': 0,
+        'created_at': created_at,
+        'updated_at': now,
+    }
+
+
+def validate_posts(items, user_id):
+    """Turn import items into posts rows, or raise PostImportError listing every invalid item"""
+    now = datetime.utcnow()
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(_post_row(item, user_id, now))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        raise PostImportError(errors)
+    return rows
+
+
+def import_posts(user_id, items, chunk_size=IMPORT_CHUNK_SIZE):
+    """Create many posts for user_id in one transaction
+
+    Posts are inserted with multi-row INSERTs of chunk_size rows. Search
+    index, tag and stats maintenance then runs once over the whole batch
+    instead of once per post, and the affected cache scopes are bumped
+    once at the end. Returns a summary including posts per second.
+    """
+    if len(items) > MAX_IMPORT_POSTS:
+        raise PostImportError([{'index': None, 'error': f"At most {MAX_IMPORT_POSTS} posts per import"}])
+
+    started = time.perf_counter()
+    rows = validate_posts(items, user_id)
+
+    try:
+        ids = []
+        for start in range(0, len(rows), chunk_size):
+            ids.extend(insert_returning_ids(Post.__table__, rows[start:start + chunk_size],
+                                            match_columns=IMPORT_MATCH_COLUMNS))
+
+        # Transient objects carrying the new ids, for the batch maintenance helpers
+        posts = [Post(id=post_id, **row) for post_id, row in zip(ids, rows)]
+        index_new_posts(posts)
+        add_new_post_tags(posts)
+        counted = add_tag_counts(posts)
+        add_post_stats(posts)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # New ids have no cached entries of their own, so only the shared scopes need bumping
+    if ids:
+        scopes = {'posts', 'stats', f'author:{user_id}'}
+        for post in posts:
+            scopes.update(f'tag:{tag}' for tag in normalize_tags(post.tags))
+        if counted:
+            scopes.add('tags')
+        bump_generations(scopes)
+        delete_cached_data(*(missing_post_cache_key(post_id) for post_id in ids))
+        fan_out(user_id, [post.id for post in posts if post.is_published])
+
+    elapsed = time.perf_counter() - started
+    return {
+        'created': len(ids),
+        'ids': ids,
+        'seconds': round(elapsed, 3),
+        'posts_per_second': round(len(ids) / elapsed, 1) if elapsed > 0 else None
+    }
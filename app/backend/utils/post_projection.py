@@ -0,0 +1,93 @@
+from functools import lru_cache
+from models.user import User, db
+from models.post import Post
+
+# Post.to_dict() keys in response order, and the column each one is read from
+POST_COLUMNS = {
+    'id': Post.id,
+    'user_id': Post.user_id,
+    'content': Post.content,
+    'media_url': Post.media_url,
+    'media_type': Post.media_type,
+    'media_metadata': Post.media_metadata,
+    'title': Post.title,
+    'tags': Post.tags,
+    'is_published': Post.is_published,
+    'is_featured': Post.is_featured,
+    'likes_count': Post.likes_count,
+    'comments_count': Post.comments_count,
+    'shares_count': Post.shares_count,
+    'views_count': Post.views_count,
+    'unique_viewers': Post.unique_viewers,
+    'created_at': Post.created_at,
+    'updated_at': Post.updated_at,
+}
+
+# Public author columns nested under 'user' (never password_hash or email)
+USER_COLUMNS = {
+    'id': User.id,
+    'username': User.username,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'profile_image': User.profile_image,
+}
+
+ALL_POST_FIELDS = tuple(POST_COLUMNS) + ('user',)
+
+# How to turn a column value into its JSON value, matching Post.to_dict()
+_CONVERSIONS = {
+    'created_at': '({v}.isoformat() if {v} is not None else None)',
+    'updated_at': '({v}.isoformat() if {v} is not None else None)',
+    'tags': '({v} or [])',
+    'unique_viewers': '({v} or 0)',
+}
+
+
+def listing_columns(fields=ALL_POST_FIELDS):
+    """Columns to select for the given response fields, in serializer order"""
+    columns = [POST_COLUMNS[field] for field in fields if field != 'user']
+    if 'user' in fields:
+        columns.extend(USER_COLUMNS.values())
+    return columns
+
+
+def listing_query(fields=ALL_POST_FIELDS):
+    """Query of plain rows holding only the columns needed for fields
+
+    The author is outer-joined column by column, so no ORM objects are
+    built and nothing beyond the public profile fields is read.
+    """
+    query = db.session.query(*listing_columns(fields)).select_from(Post)
+    if 'user' in fields:
+        query = query.outerjoin(User, User.id == Post.user_id)
+    return query
+
+
+@lru_cache(maxsize=64)
+def compile_row_serializer(fields=ALL_POST_FIELDS):
+    """Build a function that turns a listing_query() row into a post dict
+
+    The function body is generated once per field tuple: each key reads a
+    fixed row index, so serializing a row is a single dict literal with no
+    attribute lookups or per-field branching. Extra trailing columns (e.g. a
+    sort value added for cursors) are ignored.
+    """
+    entries = []
+    index = 0
+    for field in fields:
+        if field == 'user':
+            continue
+        value = _CONVERSIONS.get(field, '{v}').format(v=f'row[{index}]')
+        entries.append(f'{field!r}: {value}')
+        index += 1
+
+    if 'user' in fields:
+        user_entries = ', '.join(
+            f'{name!r}: row[{index + offset}]' for offset, name in enumerate(USER_COLUMNS)
+        )
+        entries.append(f"'user': {{{user_entries}}} if row[{index}] is not None else None")
+
+    source = 'def serialize(row):\n    return {' + ', '.join(entries) + '}\n'
+    namespace = {}
+    exec(compile(source, f'<post serializer {",".join(fields)}>', 'exec'), namespace)
+    return namespace['serialize']
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, delete
+from models.user import db
+from models.stats import PostCounter, PostDailyCount
+from utils.db_utils import upsert_increment
+
+COUNTER_NAMES = ['total_posts', 'featured_posts', 'total_likes', 'total_views']
+
+RECENT_WINDOW_DAYS = 7
+
+
+def stats_snapshot(post):
+    """What a post contributes to the site-wide counters in its current state
+
+    Pass None for "no post" (before create, after delete).
+    """
+    if post is None or not post.is_published:
+        return {'day': None, 'total_posts': 0, 'featured_posts': 0, 'total_likes': 0, 'total_views': 0}
+    created_at = post.created_at or datetime.utcnow()
+    return {
+        'day': created_at.date(),
+        'total_posts': 1,
+        'featured_posts': 1 if post.is_featured else 0,
+        'total_likes': post.likes_count or 0,
+        'total_views': post.views_count or 0
+    }
+
+
+def bump_post_stats(**deltas):
+    """Add deltas to named counters inside the current transaction"""
+    rows = [{'name': name, 'value': delta} for name, delta in deltas.items() if delta]
+    upsert_increment(PostCounter, rows, ['name'], ['value'])
+
+
+def update_post_stats(old_snapshot, new_snapshot):
+    """Apply the difference between two stats_snapshot() results"""
+    bump_post_stats(**{
+        name: new_snapshot[name] - old_snapshot[name] for name in COUNTER_NAMES
+    })
+
+    buckets = {}
+    if old_snapshot['total_posts']:
+        buckets[old_snapshot['day']] = buckets.get(old_snapshot['day'], 0) - 1
+    if new_snapshot['total_posts']:
+        buckets[new_snapshot['day']] = buckets.get(new_snapshot['day'], 0) + 1
+    upsert_increment(
+        PostDailyCount,
+        [{'day': day, 'posts': delta} for day, delta in buckets.items() if delta],
+        ['day'], ['posts']
+    )
+
+
+def add_post_stats(posts):
+    """Count newly created posts, with one upsert per table for the whole batch"""
+    totals = dict.fromkeys(COUNTER_NAMES, 0)
+    buckets = {}
+    for post in posts:
+        snapshot = stats_snapshot(post)
+        for name in COUNTER_NAMES:
+            totals[name] += snapshot[name]
+        if snapshot['total_posts']:
+            buckets[snapshot['day']] = buckets.get(snapshot['day'], 0) + 1
+    bump_post_stats(**totals)
+    upsert_increment(
+        PostDailyCount,
+        [{'day': day, 'posts': count} for day, count in buckets.items()],
+        ['day'], ['posts']
+    )
+
+
+def read_post_stats():
+    """Current totals plus the rolling recent_posts window
+
+    recent_posts sums whole daily buckets: today plus the previous
+    RECENT_WINDOW_DAYS - 1 days.
+    """
+    values = dict(db.session.query(PostCounter.name, PostCounter.value).all())
+    window_start = datetime.utcnow().date() - timedelta(days=RECENT_WINDOW_DAYS - 1)
+    recent_posts = db.session.query(func.sum(PostDailyCount.posts)).filter(
+        PostDailyCount.day >= window_start
+    ).scalar() or 0
+
+    return {
+        'total_posts': int(values.get('total_posts', 0)),
+        'featured_posts': int(values.get('featured_posts', 0)),
+        'recent_posts': int(recent_posts),
+        'total_likes': int(values.get('total_likes', 0)),
+        'total_views': int(values.get('total_views', 0))
+    }
+
+
+def reconcile_post_stats():
+    """Recompute counters and daily buckets from the posts table
+
+    Returns {counter name: drift} for counters that had drifted.
+    """
+    from models.post import Post
+
+    published = db.session.query(Post).filter(Post.is_published == True)
+    actual = {
+        'total_posts': published.count(),
+        'featured_posts': published.filter(Post.is_featured == True).count(),
+        'total_likes': db.session.query(func.sum(Post.likes_count)).filter(Post.is_published == True).scalar() or 0,
+        'total_views': db.session.query(func.sum(Post.views_count)).filter(Post.is_published == True).scalar() or 0
+    }
+
+    # Likes on hot posts wait in shard rows until the next fold
+    from models.like import PostLikeShard
+    actual['total_likes'] += db.session.query(func.sum(PostLikeShard.delta)).join(
+        Post, Post.id == PostLikeShard.post_id
+    ).filter(Post.is_published == True).scalar() or 0
+
+    stored = dict(db.session.query(PostCounter.name, PostCounter.value).all())
+    drift = {
+        name: int(actual[name]) - int(stored.get(name, 0))
+        for name in COUNTER_NAMES
+        if int(actual[name]) != int(stored.get(name, 0))
+    }
+    bump_post_stats(**drift)
+
+    day = func.date(Post.created_at)
+    daily = db.session.query(day, func.count(Post.id)).filter(
+        Post.is_published == True, Post.created_at.isnot(None)
+    ).group_by(day).all()
+    db.session.execute(delete(PostDailyCount))
+    if daily:
+        db.session.execute(
+            PostDailyCount.__table__.insert(),
+            [
+                {'day': d if not isinstance(d, str) else datetime.strptime(d, '%Y-%m-%d').date(), 'posts': count}
+                for d, count in daily
+            ]
+        )
+
+    db.session.commit()
+    return drift
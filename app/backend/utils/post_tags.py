@@ -0,0 +1,178 @@
+from datetime import datetime
+from collections import Counter
+from sqlalchemy import select, delete, func, desc
+from models.user import db
+from models.tag import PostTag, TagCount
+from utils.db_utils import upsert_increment
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag):
+    """Canonical form used for storage and matching"""
+    return str(tag).strip().lower()[:MAX_TAG_LENGTH]
+
+
+def normalize_tags(tags):
+    """Normalize a list of tags, dropping blanks and duplicates but keeping order"""
+    normalized = (normalize_tag(tag) for tag in tags or [])
+    return list(dict.fromkeys(tag for tag in normalized if tag))
+
+
+def sync_post_tags(post):
+    """Bring post_tags in line with post.tags inside the current transaction
+
+    The post must already have an id (flush first when creating).
+    """
+    desired = set(normalize_tags(post.tags))
+    existing = set(
+        db.session.execute(select(PostTag.tag).where(PostTag.post_id == post.id)).scalars()
+    )
+
+    removed = existing - desired
+    if removed:
+        db.session.execute(
+            delete(PostTag).where(PostTag.post_id == post.id, PostTag.tag.in_(removed))
+        )
+
+    added = desired - existing
+    if added:
+        created_at = post.created_at or datetime.utcnow()
+        db.session.execute(
+            PostTag.__table__.insert(),
+            [{'post_id': post.id, 'tag': tag, 'created_at': created_at} for tag in added]
+        )
+
+
+def add_new_post_tags(posts):
+    """Insert post_tags rows for posts that have none yet, in one statement"""
+    rows = [
+        {'post_id': post.id, 'tag': tag, 'created_at': post.created_at or datetime.utcnow()}
+        for post in posts
+        for tag in normalize_tags(post.tags)
+    ]
+    if rows:
+        db.session.execute(PostTag.__table__.insert(), rows)
+
+
+def counted_tags(post):
+    """Tags a post contributes to tag_counts: {normalized: display name}
+
+    Only published posts count, so publishing and unpublishing are just a
+    change of this set like any other edit.
+    """
+    if not post.is_published:
+        return {}
+    names = {}
+    for tag in post.tags or []:
+        display = str(tag).strip()[:MAX_TAG_LENGTH]
+        normalized = normalize_tag(tag)
+        if normalized and normalized not in names:
+            names[normalized] = display
+    return names
+
+
+def update_tag_counts(old_tags, new_tags):
+    """Apply the difference between two counted_tags() snapshots to tag_counts"""
+    rows = [
+        {'tag': tag, 'name': new_tags[tag], 'post_count': 1}
+        for tag in new_tags.keys() - old_tags.keys()
+    ] + [
+        {'tag': tag, 'name': old_tags[tag], 'post_count': -1}
+        for tag in old_tags.keys() - new_tags.keys()
+    ]
+    upsert_increment(TagCount, rows, ['tag'], ['post_count'])
+
+
+def add_tag_counts(posts):
+    """Count the tags of newly created posts with one upsert; returns the tags counted"""
+    counts = Counter()
+    names = {}
+    for post in posts:
+        for tag, name in counted_tags(post).items():
+            counts[tag] += 1
+            names.setdefault(tag, name)
+    upsert_increment(
+        TagCount,
+        [{'tag': tag, 'name': names[tag], 'post_count': count} for tag, count in counts.items()],
+        ['tag'], ['post_count']
+    )
+    return set(counts)
+
+
+def top_tags(limit):
+    """Most used tags, read straight off the post_count index"""
+    return (
+        TagCount.query
+        .filter(TagCount.post_count > 0)
+        .order_by(desc(TagCount.post_count), TagCount.tag)
+        .limit(limit)
+        .all()
+    )
+
+
+def remove_post_tags(post_id):
+    """Remove all tag rows for a post inside the current transaction"""
+    db.session.execute(delete(PostTag).where(PostTag.post_id == post_id))
+
+
+def posts_with_all_tags(tags):
+    """Subquery of post ids carrying every tag in `tags`
+
+    Each tag is an index range on (tag, created_at); grouping the union of
+    those ranges by post and keeping groups that hit every tag intersects
+    them without touching the posts table.
+    """
+    tags = normalize_tags(tags)
+    query = select(PostTag.post_id).where(PostTag.tag.in_(tags))
+    if len(tags) > 1:
+        query = query.group_by(PostTag.post_id).having(func.count(PostTag.tag) == len(tags))
+    return query
+
+
+def backfill_post_tags():
+    """Populate post_tags from the JSON tags column; returns the number of posts processed"""
+    from models.post import Post
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = Post.query.filter(Post.id > last_id).order_by(Post.id).limit(500).all()
+        if not batch:
+            break
+        for post in batch:
+            sync_post_tags(post)
+        db.session.commit()
+        count += len(batch)
+        last_id = batch[-1].id
+    return count
+
+
+def rebuild_tag_counts():
+    """Recompute tag_counts from scratch; returns the number of distinct tags"""
+    from models.post import Post
+
+    counts = Counter()
+    names = {}
+    last_id = 0
+    while True:
+        batch = (
+            Post.query.with_entities(Post.id, Post.tags, Post.is_published)
+            .filter(Post.id > last_id).order_by(Post.id).limit(1000).all()
+        )
+        if not batch:
+            break
+        for row in batch:
+            for tag, name in counted_tags(row).items():
+                counts[tag] += 1
+                names.setdefault(tag, name)
+        last_id = batch[-1].id
+
+    db.session.execute(delete(TagCount))
+    if counts:
+        db.session.execute(
+            TagCount.__table__.insert(),
+            [{'tag': tag, 'name': names[tag], 'post_count': count} for tag, count in counts.items()]
+        )
+    db.session.commit()
+    return len(counts)
@@ -0,0 +1,293 @@
+import hashlib
+import logging
+import struct
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from flask import Response, request, current_app
+from config import Config
+from utils.cache import cache_client, local_cache, ensure_invalidation_listener
+from utils.compression import compress_gzip, compress_brotli, negotiate_encoding, encoded_etag
+
+logger = logging.getLogger(__name__)
+
+# Wire format version for entries stored in Redis
+ENTRY_FORMAT = b'\x02'
+
+class CachedResponse:
+    """A fully encoded JSON response body plus its precompressed variants
+
+    Serving a cache hit is a byte copy: nothing is decoded, re-serialized
+    or compressed on the request path. fresh_until is the soft expiry; past
+    it the entry may still be served while a refresh runs in the background.
+    """
+
+    __slots__ = ('body', 'etag', 'variants', 'fresh_until')
+
+    def __init__(self, body, etag, variants=None, fresh_until=0.0):
+        self.body = body
+        self.etag = etag
+        self.variants = variants or {}  # Content-Encoding -> bytes
+        self.fresh_until = fresh_until  # Unix timestamp
+
+    @classmethod
+    def from_data(cls, data, fresh_for=0, etag=None):
+        """Encode data as jsonify does outside debug mode (compact separators), then precompress it"""
+        body = current_app.json.dumps(data, separators=(',', ':')).encode('utf-8') + b'\n'
+        return cls.from_body(body, fresh_for, etag)
+
+    @classmethod
+    def from_body(cls, body, fresh_for=0, etag=None):
+        """The ETag defaults to a hash of the body; pass a version_etag() to tie it to content versions"""
+        if etag is None:
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        variants = {}
+        if len(body) >= Config.COMPRESSION_MIN_SIZE:
+            variants['gzip'] = compress_gzip(body)
+            compressed = compress_brotli(body)
+            if compressed is not None:
+                variants['br'] = compressed
+        return cls(body, etag, variants, time.time() + fresh_for)
+
+    @property
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+    def encode(self):
+        """Length-prefixed binary framing: fresh_until, etag, body, then (encoding, bytes) pairs"""
+        parts = [ENTRY_FORMAT]
+        fields = [struct.pack('>d', self.fresh_until), self.etag.encode('ascii'), self.body]
+        for encoding, payload in self.variants.items():
+            fields.extend([encoding.encode('ascii'), payload])
+        for field in fields:
+            parts.append(struct.pack('>I', len(field)))
+            parts.append(field)
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, raw):
+        if not raw or raw[:1] != ENTRY_FORMAT:
+            return None
+        fields = []
+        offset = 1
+        while offset < len(raw):
+            (length,) = struct.unpack_from('>I', raw, offset)
+            offset += 4
+            fields.append(raw[offset:offset + length])
+            offset += length
+        (fresh_until,) = struct.unpack('>d', fields[0])
+        etag, body = fields[1].decode('ascii'), fields[2]
+        variants = {
+            fields[i].decode('ascii'): fields[i + 1]
+            for i in range(3, len(fields) - 1, 2)
+        }
+        return cls(body, etag, variants, fresh_until)
+
+    def choose_encoding(self):
+        """Best precompressed variant the client accepts, or None for identity"""
+        return negotiate_encoding(self.variants)
+
+    def to_response(self, status=200):
+        encoding = self.choose_encoding()
+        etag = encoded_etag(self.etag, encoding)
+        if status == 200 and matching_etag(etag, encodings=()):
+            response = not_modified_response(etag)
+            if self.variants:
+                response.vary.add('Accept-Encoding')
+            return response
+
+        response = Response(
+            self.variants[encoding] if encoding else self.body,
+            status=status,
+            mimetype='application/json'
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if self.variants:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        return response
+
+def version_etag(*parts):
+    """Strong ETag built from content versions (ids, timestamps, generations) rather than the body"""
+    return hashlib.blake2b('|'.join(str(part) for part in parts).encode('utf-8'), digest_size=16).hexdigest()
+
+def matching_etag(etag, encodings=('br', 'gzip')):
+    """The validator in If-None-Match naming etag or one of its compressed variants, or None"""
+    for candidate in (etag, *(encoded_etag(etag, encoding) for encoding in encodings)):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+def not_modified_response(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def get_cached_response(key, expire_time=300):
+    """Look up an encoded response in L1, then Redis (fresh or stale)"""
+    found, entry = local_cache.get(key)
+    if found:
+        return entry
+
+    ensure_invalidation_listener()
+    entry = CachedResponse.decode(cache_client.run(lambda r: r.get(key)))
+    if entry is None:
+        local_cache.record(key, 'misses')
+        return None
+    local_cache.record(key, 'l2_hits')
+    local_cache.set(key, entry, expire_time)
+    return entry
+
+def set_cached_response(key, data, expire_time=300, stale_time=None, etag=None):
+    """Encode data once, store it in both tiers and return the CachedResponse
+
+    The entry is fresh for expire_time seconds (soft TTL) and kept for
+    another stale_time seconds (default: expire_time) before it is dropped
+    for good (hard TTL).
+    """
+    if stale_time is None:
+        stale_time = expire_time
+    entry = CachedResponse.from_data(data, expire_time, etag)
+    hard_ttl = expire_time + stale_time
+    local_cache.set(key, entry, hard_ttl)
+    payload = entry.encode()
+    cache_client.run(lambda r: r.setex(key, hard_ttl, payload))
+    return entry
+
+# Single-flight: one caller recomputes a missing key, concurrent callers wait for its result
+SINGLE_FLIGHT_LOCK_TTL_MS = 10000  # Upper bound on how long a recompute may hold the Redis lock
+SINGLE_FLIGHT_WAIT = 2.0  # Seconds a follower waits for the leader before computing itself
+SINGLE_FLIGHT_POLL = 0.05
+
+_flight_locks = {}  # key -> [lock, number of callers using it]
+_flight_guard = threading.Lock()
+
+# Keys with a background refresh running in this process
+_refreshing = set()
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+@contextmanager
+def _local_flight(key):
+    """Serialize callers for the same key within this process"""
+    with _flight_guard:
+        slot = _flight_locks.setdefault(key, [threading.Lock(), 0])
+        slot[1] += 1
+    slot[0].acquire()
+    try:
+        yield
+    finally:
+        slot[0].release()
+        with _flight_guard:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del _flight_locks[key]
+
+def _acquire_lock(key, token):
+    """True: we lead; False: another process leads; None: Redis unavailable"""
+    return cache_client.run(
+        lambda r: bool(r.set(f"lock:{key}", token, nx=True, px=SINGLE_FLIGHT_LOCK_TTL_MS))
+    )
+
+def _release_lock(key, token):
+    cache_client.run(lambda r: r.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token))
+
+def _wait_for_leader(key, expire_time):
+    """Poll for the value another process is computing"""
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL)
+        entry = get_cached_response(key, expire_time)
+        if entry is not None:
+            return entry
+    return None
+
+def _refresh_in_background(key, compute, expire_time, stale_time, version=None):
+    """Recompute a stale entry off the request path, at most once across workers"""
+    with _flight_guard:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    token = uuid.uuid4().hex
+    acquired = _acquire_lock(key, token)
+    if acquired is False:
+        with _flight_guard:
+            _refreshing.discard(key)
+        return
+
+    app = current_app._get_current_object()
+
+    def refresh():
+        try:
+            # Another worker may already have refreshed Redis; then just pick that up
+            latest = CachedResponse.decode(cache_client.run(lambda r: r.get(key)))
+            if latest is not None and latest.is_fresh:
+                local_cache.set(key, latest, expire_time)
+                return
+            with app.app_context():
+                etag = version() if version else None
+                set_cached_response(key, compute(), expire_time, stale_time, etag)
+        except Exception:
+            logger.exception("Background refresh of %s failed", key)
+        finally:
+            if acquired:
+                _release_lock(key, token)
+            with _flight_guard:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, name='cache-refresh', daemon=True).start()
+
+def get_or_compute_response(key, compute, expire_time=300, stale_time=None, version=None):
+    """Return the cached response for key, computing it at most once across workers
+
+    A fresh entry is returned as is. A stale entry (past its soft TTL but
+    within its hard TTL) is returned immediately while one background thread
+    recomputes it. On a hard miss, threads in this process queue on a
+    per-key lock; across processes the first caller takes a short-lived
+    Redis lock (SET NX PX) and the others poll briefly for its result. If
+    the leader is too slow or Redis is unavailable, followers fall back to
+    computing the value themselves.
+
+    version, if given, is a cheap callable returning a version_etag() for the
+    current content (or None). On a miss it is checked against If-None-Match
+    first, so a client that is up to date gets a 304 without compute() ever
+    running; the returned entry then has an empty body and is not cached.
+    """
+    entry = get_cached_response(key, expire_time)
+    if entry is not None:
+        if not entry.is_fresh:
+            _refresh_in_background(key, compute, expire_time, stale_time, version)
+        return entry
+
+    etag = version() if version else None
+    matched = matching_etag(etag) if etag is not None else None
+    if matched:
+        # The client holds this version in some content-coding; answer with the tag it sent
+        return CachedResponse(b'', matched)
+
+    with _local_flight(key):
+        # Another thread may have filled the cache while we waited
+        found, entry = local_cache.get(key)
+        if found:
+            return entry
+
+        token = uuid.uuid4().hex
+        acquired = _acquire_lock(key, token)
+        if acquired is False:
+            entry = _wait_for_leader(key, expire_time)
+            if entry is not None:
+                return entry
+
+        try:
+            return set_cached_response(key, compute(), expire_time, stale_time, etag)
+        finally:
+            if acquired:
+                _release_lock(key, token)
@@ -0,0 +1,193 @@
+import math
+import re
+from collections import Counter
+from sqlalchemy import func, case, delete
+from models.user import db
+from models.search import SearchTerm, SearchPosting, SearchIndexStats
+from utils.db_utils import upsert_increment
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Field weights applied to term frequencies at index time
+TITLE_WEIGHT = 2
+TAG_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in',
+    'into', 'is', 'it', 'no', 'not', 'of', 'on', 'or', 'such', 'that', 'the',
+    'their', 'then', 'there', 'these', 'they', 'this', 'to', 'was', 'will', 'with'
+}
+
+STATS_ROW_ID = 1
+
+
+def tokenize(text):
+    """Split text into lowercase index terms"""
+    if not text:
+        return []
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if token not in STOP_WORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def post_terms(post):
+    """Weighted term frequencies for a post's title, content and tags"""
+    terms = Counter()
+    for token in tokenize(post.content):
+        terms[token] += CONTENT_WEIGHT
+    for token in tokenize(post.title):
+        terms[token] += TITLE_WEIGHT
+    for tag in post.tags or []:
+        for token in tokenize(str(tag)):
+            terms[token] += TAG_WEIGHT
+    return terms
+
+
+def _remove_postings(post_id):
+    """Drop a post's postings and roll back its contribution to the statistics"""
+    old = db.session.query(SearchPosting.term, SearchPosting.doc_length).filter_by(post_id=post_id).all()
+    if not old:
+        return
+
+    upsert_increment(
+        SearchTerm,
+        [{'term': term, 'doc_freq': -1} for term, _ in old],
+        ['term'], ['doc_freq']
+    )
+    upsert_increment(
+        SearchIndexStats,
+        [{'id': STATS_ROW_ID, 'doc_count': -1, 'total_length': -old[0].doc_length}],
+        ['id'], ['doc_count', 'total_length']
+    )
+    db.session.execute(delete(SearchPosting).where(SearchPosting.post_id == post_id))
+
+
+def index_post(post):
+    """(Re)index a post inside the current transaction
+
+    The post must already have an id (flush first when creating).
+    """
+    _remove_postings(post.id)
+    index_new_posts([post])
+
+
+def index_new_posts(posts):
+    """Index posts that have no postings yet inside the current transaction
+
+    Postings, document frequencies and statistics for the whole batch are
+    written with one statement each, so bulk imports pay per batch rather
+    than per post.
+    """
+    postings = []
+    doc_freqs = Counter()
+    doc_count = 0
+    total_length = 0
+    for post in posts:
+        terms = post_terms(post)
+        if not terms:
+            continue
+        doc_length = sum(terms.values())
+        postings.extend(
+            {'term': term, 'post_id': post.id, 'term_freq': freq, 'doc_length': doc_length}
+            for term, freq in terms.items()
+        )
+        doc_freqs.update(terms.keys())
+        doc_count += 1
+        total_length += doc_length
+
+    if not postings:
+        return
+
+    db.session.execute(SearchPosting.__table__.insert(), postings)
+    upsert_increment(
+        SearchTerm,
+        [{'term': term, 'doc_freq': freq} for term, freq in doc_freqs.items()],
+        ['term'], ['doc_freq']
+    )
+    upsert_increment(
+        SearchIndexStats,
+        [{'id': STATS_ROW_ID, 'doc_count': doc_count, 'total_length': total_length}],
+        ['id'], ['doc_count', 'total_length']
+    )
+
+
+def remove_post(post_id):
+    """Remove a post from the index inside the current transaction"""
+    _remove_postings(post_id)
+
+
+def search_scores(query_text):
+    """Build a (post_id, score) subquery of BM25-ranked matches for query_text
+
+    Only the postings lists of the query terms are read, so the cost depends
+    on how many posts contain the terms rather than on the size of the posts
+    table. Returns None when the query has no searchable terms.
+    """
+    query_terms = list(dict.fromkeys(tokenize(query_text)))[:MAX_QUERY_TERMS]
+    if not query_terms:
+        return None
+
+    stats = db.session.get(SearchIndexStats, STATS_ROW_ID)
+    if not stats or stats.doc_count <= 0:
+        return None
+
+    doc_freqs = dict(
+        db.session.query(SearchTerm.term, SearchTerm.doc_freq)
+        .filter(SearchTerm.term.in_(query_terms), SearchTerm.doc_freq > 0)
+        .all()
+    )
+    if not doc_freqs:
+        return None
+
+    doc_count = stats.doc_count
+    avg_length = max(stats.total_length / doc_count, 1.0)
+    idf = {
+        term: math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        for term, df in doc_freqs.items()
+    }
+
+    term_weight = case(idf, value=SearchPosting.term, else_=0.0)
+    tf = SearchPosting.term_freq
+    length_norm = BM25_K1 * (1 - BM25_B) + SearchPosting.doc_length * (BM25_K1 * BM25_B / avg_length)
+    score = term_weight * tf * (BM25_K1 + 1) / (tf + length_norm)
+
+    return (
+        db.session.query(
+            SearchPosting.post_id.label('post_id'),
+            func.sum(score).label('score')
+        )
+        .filter(SearchPosting.term.in_(list(doc_freqs)))
+        .group_by(SearchPosting.post_id)
+        .subquery('search_scores')
+    )
+
+
+def rebuild_index():
+    """Rebuild the whole index from the posts table; returns the number of posts indexed"""
+    from models.post import Post
+
+    db.session.execute(delete(SearchPosting))
+    db.session.execute(delete(SearchTerm))
+    db.session.execute(delete(SearchIndexStats))
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = Post.query.filter(Post.id > last_id).order_by(Post.id).limit(500).all()
+        if not batch:
+            break
+        for post in batch:
+            index_post(post)
+        count += len(batch)
+        last_id = batch[-1].id
+    db.session.commit()
+    return count
@@ -0,0 +1,359 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from sqlalchemy import desc
+from config import Config
+from models.user import db
+from models.follow import Follow, FollowCount
+from utils.cache import (
+    cache_client, get_cache_key, get_generations, get_cached_many, set_cached_many,
+    get_cached_data, set_cached_data, delete_cached_data
+)
+
+logger = logging.getLogger(__name__)
+
+# Redis sorted set of post ids per user, scored by id, so a page is one id range.
+# Member 0 (score 0) is always present: Redis drops empty keys, and the marker
+# keeps a timeline with no posts warm instead of rebuilding it on every read.
+TIMELINE_PREFIX = 'timeline:'
+EMPTY_MARKER = 0
+
+# Adds post ids to a timeline only if it exists (cold ones are rebuilt on read),
+# then trims it to the newest ARGV[1] posts, keeping the marker at rank 0.
+# ARGV: max length, then post ids
+_PUSH_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV do
+    redis.call('zadd', KEYS[1], ARGV[i], ARGV[i])
+end
+redis.call('zremrangebyrank', KEYS[1], 1, -(tonumber(ARGV[1]) + 1))
+return 1
+"""
+
+# Followees over the fan-out threshold, cached briefly so pages do not re-read the follow graph
+PULLED_AUTHORS_PREFIX = 'feed:pulled'
+PULLED_AUTHORS_TTL = 60
+
+# Authors with posts that were not fanned out. They stay pulled on read, even after dropping
+# under the threshold, until their followers' timelines are rebuilt (see fan_out)
+UNFANNED_AUTHORS_KEY = 'feed:unfanned_authors'
+
+# In-process stand-in used while Redis is unavailable: user_id -> list of post ids, newest first
+LOCAL_TIMELINE_USERS = 10000
+_local_timelines = OrderedDict()
+_local_unfanned = set()
+_local_lock = threading.Lock()
+
+# Cached recent post ids of a pulled (high-follower) author, versioned by the author scope
+RECENT_POSTS_PREFIX = 'feed:recent'
+RECENT_POSTS_TTL = 600
+
+_metrics = {
+    'fanout_posts': 0,            # Posts pushed to follower timelines
+    'fanout_timeline_writes': 0,  # Follower timelines written to (per post batch)
+    'fanout_skipped_posts': 0,    # Posts by authors over the threshold, left to read-time merge
+    'backfilled_authors': 0,      # Authors back under the threshold whose followers' timelines were rebuilt
+    'feed_reads': 0,
+    'merged_reads': 0,            # Reads that merged at least one pulled author
+    'pulled_authors': 0,          # Pulled author lists merged, summed over reads
+    'merge_seconds': 0.0,
+}
+_metrics_lock = threading.Lock()
+
+def _record(**deltas):
+    with _metrics_lock:
+        for name, delta in deltas.items():
+            _metrics[name] += delta
+
+def timeline_metrics():
+    """Fan-out and read-time merge counts, for tuning FEED_FANOUT_FOLLOWER_THRESHOLD"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics['merge_seconds'] = round(metrics['merge_seconds'], 6)
+    metrics['avg_merge_ms'] = (
+        round(metrics['merge_seconds'] * 1000 / metrics['merged_reads'], 3) if metrics['merged_reads'] else None
+    )
+    metrics['fanout_follower_threshold'] = Config.FEED_FANOUT_FOLLOWER_THRESHOLD
+    return metrics
+
+def timeline_key(user_id):
+    return f"{TIMELINE_PREFIX}{user_id}"
+
+def follower_count(user_id):
+    count = db.session.query(FollowCount.followers).filter(FollowCount.user_id == user_id).scalar()
+    return count or 0
+
+def is_pull_author(user_id):
+    """Authors with more followers than the threshold are merged in at read time instead of fanned out"""
+    return follower_count(user_id) > Config.FEED_FANOUT_FOLLOWER_THRESHOLD
+
+def _mark_unfanned(author_id):
+    cache_client.run(lambda r: r.sadd(UNFANNED_AUTHORS_KEY, author_id))
+    with _local_lock:
+        _local_unfanned.add(author_id)
+
+def _clear_unfanned(author_id):
+    cache_client.run(lambda r: r.srem(UNFANNED_AUTHORS_KEY, author_id))
+    with _local_lock:
+        _local_unfanned.discard(author_id)
+
+def unfanned_author_ids(author_ids):
+    """Which of author_ids have posts that were not fanned out to their followers"""
+    if not author_ids:
+        return set()
+    flags = cache_client.run(lambda r: r.smismember(UNFANNED_AUTHORS_KEY, author_ids))
+    with _local_lock:
+        unfanned = {author_id for author_id in author_ids if author_id in _local_unfanned}
+    if flags is not None:
+        unfanned.update(author_id for author_id, flag in zip(author_ids, flags) if flag)
+    return unfanned
+
+def followee_ids(user_id):
+    """The user's followees split into (pushed, pulled)
+
+    Pulled are authors over the fan-out threshold, plus authors whose posts
+    from a pulled period have not reached their followers' stored timelines.
+    """
+    threshold = Config.FEED_FANOUT_FOLLOWER_THRESHOLD
+    rows = (
+        db.session.query(Follow.followee_id, FollowCount.followers)
+        .outerjoin(FollowCount, FollowCount.user_id == Follow.followee_id)
+        .filter(Follow.follower_id == user_id)
+        .all()
+    )
+    unfanned = unfanned_author_ids([
+        followee_id for followee_id, followers in rows if (followers or 0) <= threshold
+    ])
+    pushed, pulled = [], []
+    for followee_id, followers in rows:
+        if (followers or 0) > threshold or followee_id in unfanned:
+            pulled.append(followee_id)
+        else:
+            pushed.append(followee_id)
+    return pushed, pulled
+
+def follower_batches(author_id, batch_size):
+    """Yield the author's follower ids in keyset-ordered batches"""
+    last_id = 0
+    while True:
+        batch = [
+            follower_id for (follower_id,) in
+            db.session.query(Follow.follower_id)
+            .filter(Follow.followee_id == author_id, Follow.follower_id > last_id)
+            .order_by(Follow.follower_id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+def _push(user_ids, post_ids):
+    """Add post_ids to each warm timeline and trim it"""
+    max_length = Config.TIMELINE_MAX_LENGTH
+
+    def push_all(r):
+        push = r.register_script(_PUSH_SCRIPT)
+        pipe = r.pipeline(transaction=False)
+        for user_id in user_ids:
+            push(keys=[timeline_key(user_id)], args=[max_length, *post_ids], client=pipe)
+        return pipe.execute()
+
+    if cache_client.run(push_all) is None:
+        with _local_lock:
+            for user_id in user_ids:
+                timeline = _local_timelines.get(user_id)
+                if timeline is not None:
+                    _local_timelines[user_id] = sorted(set(timeline).union(post_ids), reverse=True)[:max_length]
+
+def fan_out(author_id, post_ids):
+    """Deliver newly published posts to the author's and every follower's home timeline
+
+    Followers are read in batches of TIMELINE_FANOUT_BATCH and each batch is
+    one pipelined round trip. Authors over FEED_FANOUT_FOLLOWER_THRESHOLD
+    only get their own timeline written and are marked unfanned; followers
+    pick their posts up in read_timeline(). When a marked author is back
+    under the threshold, their followers' timelines are dropped so the next
+    read rebuilds them with the posts that were never pushed. Delivery is
+    best effort: a timeline that misses a push is corrected when it is
+    rebuilt.
+    """
+    if not post_ids:
+        return
+    post_ids = sorted(post_ids)
+    try:
+        _push([author_id], post_ids)
+        if is_pull_author(author_id):
+            _mark_unfanned(author_id)
+            _record(fanout_skipped_posts=len(post_ids))
+            return
+        if unfanned_author_ids([author_id]):
+            # Clear the mark first: a timeline rebuilt from here on already treats the author as pushed
+            _clear_unfanned(author_id)
+            for batch in follower_batches(author_id, Config.TIMELINE_FANOUT_BATCH):
+                invalidate_timelines(batch)
+            _record(backfilled_authors=1)
+            return
+        written = 0
+        for batch in follower_batches(author_id, Config.TIMELINE_FANOUT_BATCH):
+            _push(batch, post_ids)
+            written += len(batch)
+        _record(fanout_posts=len(post_ids), fanout_timeline_writes=written)
+    except Exception:
+        logger.exception("Timeline fan-out for author %s failed", author_id)
+
+def rebuild_timeline(user_id):
+    """Recompute a user's timeline from the database and store it; returns the post ids
+
+    Pulled authors are stored too, so the timeline stays complete if they
+    drop back under the threshold; on read they are also merged in.
+    """
+    from models.post import Post
+
+    pushed, pulled = followee_ids(user_id)
+    authors = pushed + pulled + [user_id]
+    post_ids = [
+        post_id for (post_id,) in
+        db.session.query(Post.id)
+        .filter(Post.user_id.in_(authors), Post.is_published == True)
+        .order_by(desc(Post.id))
+        .limit(Config.TIMELINE_MAX_LENGTH)
+        .all()
+    ]
+
+    key = timeline_key(user_id)
+
+    def store(r):
+        # One transaction, so concurrent readers never see a half-built timeline
+        pipe = r.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.zadd(key, {EMPTY_MARKER: EMPTY_MARKER, **{post_id: post_id for post_id in post_ids}})
+        pipe.expire(key, Config.TIMELINE_TTL)
+        return pipe.execute()
+
+    if cache_client.run(store) is None:
+        with _local_lock:
+            _local_timelines[user_id] = post_ids
+            _local_timelines.move_to_end(user_id)
+            while len(_local_timelines) > LOCAL_TIMELINE_USERS:
+                _local_timelines.popitem(last=False)
+    return post_ids
+
+def recent_post_ids(author_ids):
+    """{author_id: recent published post ids, newest first} for pulled authors
+
+    Lists are cached under the author's generation scope, which every post
+    write by that author bumps, so they are shared by all followers and
+    refreshed only when the author posts.
+    """
+    from models.post import Post
+
+    if not author_ids:
+        return {}
+    generations = get_generations([f'author:{author_id}' for author_id in author_ids])
+    keys = {
+        author_id: get_cache_key(RECENT_POSTS_PREFIX, v=f'author:{author_id}={generation}', id=author_id)
+        for author_id, generation in zip(author_ids, generations)
+    }
+    cached = get_cached_many(list(keys.values()), RECENT_POSTS_TTL)
+
+    result = {}
+    computed = {}
+    for author_id, key in keys.items():
+        if key in cached:
+            result[author_id] = cached[key]
+            continue
+        result[author_id] = computed[key] = [
+            post_id for (post_id,) in
+            db.session.query(Post.id)
+            .filter(Post.user_id == author_id, Post.is_published == True)
+            .order_by(desc(Post.id))
+            .limit(Config.FEED_PULL_RECENT_POSTS)
+            .all()
+        ]
+    set_cached_many(computed, RECENT_POSTS_TTL)
+    return result
+
+def pulled_followee_ids(user_id):
+    """Followees whose posts are merged in at read time, cached for PULLED_AUTHORS_TTL"""
+    key = get_cache_key(PULLED_AUTHORS_PREFIX, id=user_id)
+    pulled = get_cached_data(key, PULLED_AUTHORS_TTL)
+    if pulled is None:
+        pulled = followee_ids(user_id)[1]
+        set_cached_data(key, pulled, PULLED_AUTHORS_TTL)
+    return pulled
+
+def _older_than(post_ids, before):
+    """The tail of a newest-first id list below `before`, found by bisection"""
+    if before is None:
+        return post_ids
+    return post_ids[bisect.bisect_right(post_ids, -before, key=lambda post_id: -post_id):]
+
+def read_timeline(user_id, before=None, count=None):
+    """Up to `count` post ids on a user's timeline older than `before`, newest first
+
+    The stored (pushed) timeline is read as one id range, and merged (k-way,
+    heapq.merge) with the recent posts of every followed author over the
+    fan-out threshold. Ids are deduplicated and strictly descending, so the
+    last id of a page is the cursor for the next one. A cold timeline is
+    rebuilt from the database.
+    """
+    count = count or Config.TIMELINE_MAX_LENGTH
+    pushed = _read_timeline(user_id, before, count)
+    pulled = pulled_followee_ids(user_id)
+    if not pulled:
+        _record(feed_reads=1)
+        return pushed
+
+    started = time.perf_counter()
+    sources = [pushed] + [_older_than(post_ids, before) for post_ids in recent_post_ids(pulled).values()]
+    merged = []
+    for post_id in heapq.merge(*sources, reverse=True):
+        if merged and merged[-1] == post_id:
+            continue
+        merged.append(post_id)
+        if len(merged) == count:
+            break
+    _record(feed_reads=1, merged_reads=1, pulled_authors=len(pulled), merge_seconds=time.perf_counter() - started)
+    return merged
+
+def _read_timeline(user_id, before, count):
+    key = timeline_key(user_id)
+    # Exclusive upper bound; the lower bound excludes the empty marker
+    upper = f"({before}" if before is not None else '+inf'
+
+    def read(r):
+        pipe = r.pipeline(transaction=False)
+        pipe.exists(key)
+        pipe.zrevrangebyscore(key, upper, f"({EMPTY_MARKER}", start=0, num=count)
+        pipe.expire(key, Config.TIMELINE_TTL)
+        return pipe.execute()
+
+    result = cache_client.run(read)
+    if result is None:
+        with _local_lock:
+            timeline = _local_timelines.get(user_id)
+            if timeline is not None:
+                _local_timelines.move_to_end(user_id)
+                return list(islice(_older_than(timeline, before), count))
+    elif result[0]:
+        return [int(value) for value in result[1]]
+    return list(islice(_older_than(rebuild_timeline(user_id), before), count))
+
+def invalidate_timeline(user_id):
+    """Drop a user's timeline so the next read rebuilds it (e.g. after a follow change)"""
+    invalidate_timelines([user_id])
+
+def invalidate_timelines(user_ids):
+    cache_client.run(lambda r: r.delete(*(timeline_key(user_id) for user_id in user_ids)))
+    delete_cached_data(*(get_cache_key(PULLED_AUTHORS_PREFIX, id=user_id) for user_id in user_ids))
+    with _local_lock:
+        for user_id in user_ids:
+            _local_timelines.pop(user_id, None)
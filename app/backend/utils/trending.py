@@ -0,0 +1,165 @@
+import heapq
+import math
+import threading
+import time
+from config import Config
+from utils.cache import cache_client
+from utils.view_counter import register_flush_task
+
+# Sorted set of post id -> decayed engagement, and the time its scores are relative to
+TRENDING_KEY = 'trending:posts'
+TRENDING_LANDMARK_KEY = 'trending:landmark'
+
+# Scores below this (after rescaling) no longer affect the top of the index and are dropped
+MIN_TRENDING_SCORE = 1e-3
+
+# Forward decay: an event at time t adds weight * e^(rate * (t - landmark)), so
+# existing scores never need updating and ordering equals weight * e^(-rate * age).
+# ARGV: now, rate, then post id / weight pairs
+_INCREMENT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local landmark = tonumber(redis.call('get', KEYS[2]))
+if not landmark then
+    landmark = now
+    redis.call('set', KEYS[2], ARGV[1])
+end
+local factor = math.exp(tonumber(ARGV[2]) * (now - landmark))
+for i = 3, #ARGV, 2 do
+    redis.call('zincrby', KEYS[1], string.format('%.17g', tonumber(ARGV[i + 1]) * factor), ARGV[i])
+end
+return 1
+"""
+
+# Moves the landmark to now, scaling every score by e^(-rate * elapsed) in one
+# ZUNIONSTORE, then drops negligible scores and trims to the size cap.
+# ARGV: now, rate, min interval, min score, max posts
+_RESCALE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local landmark = tonumber(redis.call('get', KEYS[2]))
+if not landmark then
+    redis.call('set', KEYS[2], ARGV[1])
+    return 0
+end
+if now - landmark < tonumber(ARGV[3]) then
+    return 0
+end
+local factor = math.exp(-tonumber(ARGV[2]) * (now - landmark))
+redis.call('zunionstore', KEYS[1], 1, KEYS[1], 'weights', string.format('%.17g', factor))
+redis.call('set', KEYS[2], ARGV[1])
+redis.call('zremrangebyscore', KEYS[1], '-inf', '(' .. ARGV[4])
+redis.call('zremrangebyrank', KEYS[1], 0, -(tonumber(ARGV[5]) + 1))
+return 1
+"""
+
+# In-process stand-in used while Redis is unavailable
+_local_scores = {}
+_local_landmark = None
+_local_lock = threading.Lock()
+
+def decay_rate():
+    return math.log(2) / Config.TRENDING_HALF_LIFE
+
+def record_trending_events(counts, event):
+    """Add `count` decayed `event`s for each {post_id: count}; O(log n) per post
+
+    Events are likes, views, comments and shares (see TRENDING_EVENT_WEIGHTS).
+    Unlikes are not subtracted: the index measures recent engagement.
+    """
+    global _local_landmark
+    weight = Config.TRENDING_EVENT_WEIGHTS[event]
+    items = [(post_id, count * weight) for post_id, count in counts.items() if count]
+    if not items:
+        return
+    now = time.time()
+    rate = decay_rate()
+
+    args = [now, rate]
+    for post_id, amount in items:
+        args.extend((post_id, amount))
+    if cache_client.run(lambda r: r.eval(_INCREMENT_SCRIPT, 2, TRENDING_KEY, TRENDING_LANDMARK_KEY, *args)) is None:
+        with _local_lock:
+            if _local_landmark is None:
+                _local_landmark = now
+            factor = math.exp(rate * (now - _local_landmark))
+            for post_id, amount in items:
+                _local_scores[post_id] = _local_scores.get(post_id, 0.0) + amount * factor
+
+def record_trending_event(post_id, event):
+    record_trending_events({post_id: 1}, event)
+
+def rescale_trending():
+    """Move the landmark to now once TRENDING_RESCALE_INTERVAL has passed
+
+    Forward-decayed scores grow as e^(rate * (now - landmark)); rescaling keeps
+    them far from float overflow without changing their order. Registered as
+    a flush task, so it is checked on every flusher tick.
+    """
+    global _local_landmark
+    now = time.time()
+    rate = decay_rate()
+    cache_client.run(lambda r: r.eval(
+        _RESCALE_SCRIPT, 2, TRENDING_KEY, TRENDING_LANDMARK_KEY,
+        now, rate, Config.TRENDING_RESCALE_INTERVAL, MIN_TRENDING_SCORE, Config.TRENDING_MAX_POSTS
+    ))
+
+    with _local_lock:
+        if _local_landmark is None or now - _local_landmark < Config.TRENDING_RESCALE_INTERVAL:
+            return
+        factor = math.exp(-rate * (now - _local_landmark))
+        kept = heapq.nlargest(
+            Config.TRENDING_MAX_POSTS,
+            ((score * factor, post_id) for post_id, score in _local_scores.items() if score * factor >= MIN_TRENDING_SCORE)
+        )
+        _local_scores.clear()
+        _local_scores.update((post_id, score) for score, post_id in kept)
+        _local_landmark = now
+
+register_flush_task(rescale_trending)
+
+def _current_factor(landmark):
+    """Multiplier turning stored scores into scores as of now"""
+    if landmark is None:
+        return 1.0
+    return math.exp(-decay_rate() * (time.time() - float(landmark)))
+
+def trending_range(start, stop):
+    """[(post_id, score as of now)] for ranks start..stop inclusive, highest first; O(log n + k)"""
+    def read(r):
+        pipe = r.pipeline(transaction=True)
+        pipe.zrevrange(TRENDING_KEY, start, stop, withscores=True)
+        pipe.get(TRENDING_LANDMARK_KEY)
+        return pipe.execute()
+
+    result = cache_client.run(read)
+    if result is None:
+        with _local_lock:
+            top = heapq.nlargest(stop + 1, _local_scores.items(), key=lambda item: item[1])[start:]
+            factor = _current_factor(_local_landmark)
+        return [(post_id, score * factor) for post_id, score in top]
+
+    members, landmark = result
+    factor = _current_factor(landmark)
+    return [(int(post_id), score * factor) for post_id, score in members]
+
+def iter_trending(chunk_size=200, max_posts=None):
+    """Yield chunks of [(post_id, score)] walking the index from the top
+
+    At most max_posts entries (default TRENDING_MAX_SCAN) are read, so a
+    filtered or deep request costs a bounded number of reads.
+    """
+    max_posts = max_posts or Config.TRENDING_MAX_SCAN
+    start = 0
+    while start < max_posts:
+        size = min(chunk_size, max_posts - start)
+        chunk = trending_range(start, start + size - 1)
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < size:
+            return
+        start += size
+
+def remove_trending(post_id):
+    cache_client.run(lambda r: r.zrem(TRENDING_KEY, post_id))
+    with _local_lock:
+        _local_scores.pop(post_id, None)
@@ -0,0 +1,136 @@
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import update, bindparam, delete, tuple_
+from models.user import db
+from models.views import PostDailyViewSketch, PostViewSketch
+from utils.hll import HyperLogLog
+from utils.view_counter import ensure_flusher, register_flush_task
+
+# Viewers seen by this process since the last flush: (post_id, day) -> HyperLogLog.
+# Memory is bounded by one sketch per post viewed today, however many viewers there are.
+_pending = {}
+_pending_lock = threading.Lock()
+
+def record_viewer(post_id, viewer):
+    """Add a viewer (e.g. a user id) to today's in-memory sketch for the post
+
+    Sketches are written to the database by flush_view_sketches().
+    """
+    ensure_flusher()
+    day = datetime.utcnow().date()
+    with _pending_lock:
+        sketch = _pending.get((post_id, day))
+        if sketch is None:
+            sketch = _pending[(post_id, day)] = HyperLogLog()
+        sketch.add(viewer)
+
+def _take_pending():
+    global _pending
+    with _pending_lock:
+        pending, _pending = _pending, {}
+    return pending
+
+def _restore_pending(pending):
+    """Merge sketches back after a failed flush; merging is idempotent, so nothing is counted twice"""
+    with _pending_lock:
+        for key, sketch in pending.items():
+            if key in _pending:
+                _pending[key].merge(sketch)
+            else:
+                _pending[key] = sketch
+
+def flush_view_sketches():
+    """Merge buffered sketches into the daily and all-time rows and refresh posts.unique_viewers
+
+    Rows are read FOR UPDATE and merged in Python; since a merge is a
+    register-wise max, workers flushing the same post in turn converge on
+    the same result. Returns the number of posts updated.
+    """
+    from models.post import Post
+
+    pending = _take_pending()
+    if not pending:
+        return 0
+
+    try:
+        daily_rows = {
+            (row.post_id, row.day): row
+            for row in PostDailyViewSketch.query.filter(
+                tuple_(PostDailyViewSketch.post_id, PostDailyViewSketch.day).in_(list(pending))
+            ).with_for_update().all()
+        }
+        post_ids = {post_id for post_id, _ in pending}
+        total_rows = {
+            row.post_id: row
+            for row in PostViewSketch.query.filter(
+                PostViewSketch.post_id.in_(post_ids)
+            ).with_for_update().all()
+        }
+        existing_posts = {
+            post_id for (post_id,) in
+            db.session.query(Post.id).filter(Post.id.in_(post_ids)).all()
+        }
+
+        totals = {}
+        for (post_id, day), sketch in pending.items():
+            if post_id not in existing_posts:
+                continue  # Deleted since it was viewed
+
+            row = daily_rows.get((post_id, day))
+            if row is None:
+                db.session.add(PostDailyViewSketch(post_id=post_id, day=day, registers=sketch.to_bytes()))
+            else:
+                row.registers = HyperLogLog.from_bytes(row.registers).merge(sketch).to_bytes()
+
+            if post_id not in totals:
+                row = total_rows.get(post_id)
+                totals[post_id] = HyperLogLog.from_bytes(row.registers) if row else HyperLogLog()
+            totals[post_id].merge(sketch)
+
+        for post_id, sketch in totals.items():
+            row = total_rows.get(post_id)
+            if row is None:
+                db.session.add(PostViewSketch(post_id=post_id, registers=sketch.to_bytes()))
+            else:
+                row.registers = sketch.to_bytes()
+
+        if totals:
+            table = Post.__table__
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('post_id')).values(unique_viewers=bindparam('n')),
+                [{'post_id': post_id, 'n': sketch.count()} for post_id, sketch in totals.items()]
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        _restore_pending(pending)
+        raise
+    return len(totals)
+
+register_flush_task(flush_view_sketches)
+
+def daily_unique_viewers(post_id, days=7):
+    """Per-day and combined unique viewer estimates for the last `days` days
+
+    The window total is the merge of the daily sketches, so a viewer who came
+    back on several days is still counted once.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = (
+        PostDailyViewSketch.query
+        .filter(PostDailyViewSketch.post_id == post_id, PostDailyViewSketch.day >= since)
+        .order_by(PostDailyViewSketch.day)
+        .all()
+    )
+    window = HyperLogLog()
+    daily = []
+    for row in rows:
+        sketch = HyperLogLog.from_bytes(row.registers)
+        window.merge(sketch)
+        daily.append({'day': row.day.isoformat(), 'unique_viewers': sketch.count()})
+    return {'days': daily, 'unique_viewers': window.count()}
+
+def remove_post_view_sketches(post_id):
+    """Delete a post's sketches inside the current transaction"""
+    db.session.execute(delete(PostDailyViewSketch).where(PostDailyViewSketch.post_id == post_id))
+    db.session.execute(delete(PostViewSketch).where(PostViewSketch.post_id == post_id))
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+import uuid
+import redis
+from collections import Counter
+from flask import current_app
+from sqlalchemy import update, bindparam
+from config import Config
+from models.user import db
+from utils.cache import cache_client
+from utils.post_stats import bump_post_stats
+
+logger = logging.getLogger(__name__)
+
+# Redis hash of post_id -> views not yet written to posts.views_count
+PENDING_VIEWS_KEY = 'views:pending'
+
+FLUSH_BATCH_SIZE = 500
+
+# In-process buffer used while Redis is unavailable
+_local_pending = Counter()
+_local_lock = threading.Lock()
+
+# Periodic write-behind jobs run by the flusher thread (flush_views is registered below)
+_flush_tasks = []
+_flusher_started = False
+
+def register_flush_task(task):
+    """Run task() inside an app context on every flusher tick"""
+    if task not in _flush_tasks:
+        _flush_tasks.append(task)
+
+def record_view(post_id):
+    """Buffer one view; the database is only touched by flush_views()"""
+    ensure_flusher()
+    if cache_client.run(lambda r: r.hincrby(PENDING_VIEWS_KEY, post_id, 1)) is None:
+        with _local_lock:
+            _local_pending[post_id] += 1
+
+def _take_pending():
+    """Atomically take every buffered increment, from Redis and from this process"""
+    pending = Counter()
+
+    flushing_key = f"views:flushing:{uuid.uuid4().hex}"
+
+    def drain(r):
+        # RENAME is atomic: views recorded after it land in a fresh pending hash
+        try:
+            r.rename(PENDING_VIEWS_KEY, flushing_key)
+        except redis.ResponseError:
+            # Nothing pending
+            return {}
+        values = r.hgetall(flushing_key)
+        r.delete(flushing_key)
+        return values
+
+    for post_id, count in (cache_client.run(drain) or {}).items():
+        pending[int(post_id)] += int(count)
+
+    with _local_lock:
+        pending.update(_local_pending)
+        _local_pending.clear()
+    return pending
+
+def _restore_pending(pending):
+    """Put increments back after a failed flush so they are retried"""
+    with _local_lock:
+        _local_pending.update(pending)
+
+def flush_views():
+    """Write buffered views to posts.views_count in batched relative updates
+
+    Each batch is one executemany of
+    UPDATE posts SET views_count = views_count + :n WHERE id = :post_id
+    so concurrent flushers and writers never overwrite each other. The
+    counts for published posts then go to the site totals and feed the
+    trending index as one batched update.
+    Returns the number of views written.
+    """
+    from models.post import Post
+    from utils.trending import record_trending_events
+
+    pending = _take_pending()
+    if not pending:
+        return 0
+
+    statement = (
+        update(Post.__table__)
+        .where(Post.__table__.c.id == bindparam('post_id'))
+        .values(views_count=Post.__table__.c.views_count + bindparam('n'))
+    )
+    items = list(pending.items())
+    published = Counter()
+    try:
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            db.session.execute(statement, [{'post_id': post_id, 'n': n} for post_id, n in batch])
+            # Site totals only cover published posts: deleting or unpublishing a post subtracts its
+            # views_count, so views buffered for it before the flush must not be added either
+            published.update({
+                post_id: pending[post_id] for (post_id,) in
+                db.session.query(Post.id).filter(
+                    Post.id.in_([post_id for post_id, _ in batch]), Post.is_published == True
+                )
+            })
+        bump_post_stats(total_views=sum(published.values()))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        _restore_pending(pending)
+        raise
+    record_trending_events(published, 'view')
+    return sum(pending.values())
+
+register_flush_task(flush_views)
+
+def ensure_flusher():
+    """Start the periodic write-behind thread once per process"""
+    global _flusher_started
+    if _flusher_started:
+        return
+    with _local_lock:
+        if _flusher_started:
+            return
+        app = current_app._get_current_object()
+        interval = Config.VIEW_FLUSH_INTERVAL
+
+        def run():
+            while True:
+                time.sleep(interval)
+                for task in list(_flush_tasks):
+                    try:
+                        with app.app_context():
+                            task()
+                    except Exception:
+                        logger.exception("Write-behind task %s failed", task.__name__)
+
+        threading.Thread(target=run, name='write-behind-flusher', daemon=True).start()
+        _flusher_started = True